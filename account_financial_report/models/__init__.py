@@ -2,5 +2,6 @@ from . import account_age_report_configuration
 from . import account_group
 from . import account
 from . import account_move_line
+from . import account_tax
 from . import ir_actions_report
 from . import res_config_settings
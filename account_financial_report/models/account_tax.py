@@ -0,0 +1,77 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from odoo import api, models, tools
+
+
+class AccountTax(models.Model):
+    _inherit = "account.tax"
+
+    @api.model
+    def _invalidate_invoice_tags_index(self):
+        self.env.registry.clear_caches()
+
+    @api.model
+    @tools.ormcache()
+    def _get_invoice_tags_index(self):
+        """Map each tax id to the ids of the tags of its invoice repartition
+        lines. The mapping is cached until the taxes, their repartition lines
+        or the tags change."""
+        tags_index = {}
+        repartition_lines = (
+            self.env["account.tax.repartition.line"]
+            .sudo()
+            .search_read(
+                [("invoice_tax_id", "!=", False)],
+                ["invoice_tax_id", "tag_ids"],
+                order="invoice_tax_id, sequence, id",
+            )
+        )
+        for repartition_line in repartition_lines:
+            tax_tags_ids = tags_index.setdefault(
+                repartition_line["invoice_tax_id"][0], []
+            )
+            for tag_id in repartition_line["tag_ids"]:
+                if tag_id not in tax_tags_ids:
+                    tax_tags_ids.append(tag_id)
+        return {tax_id: tuple(tags_ids) for tax_id, tags_ids in tags_index.items()}
+
+    def unlink(self):
+        res = super().unlink()
+        # The repartition lines are deleted in cascade by the database
+        self._invalidate_invoice_tags_index()
+        return res
+
+
+class AccountTaxRepartitionLine(models.Model):
+    _inherit = "account.tax.repartition.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["account.tax"]._invalidate_invoice_tags_index()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"invoice_tax_id", "tag_ids", "sequence"}.intersection(vals):
+            self.env["account.tax"]._invalidate_invoice_tags_index()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["account.tax"]._invalidate_invoice_tags_index()
+        return res
+
+
+class AccountAccountTag(models.Model):
+    _inherit = "account.account.tag"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "active" in vals:
+            self.env["account.tax"]._invalidate_invoice_tags_index()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["account.tax"]._invalidate_invoice_tags_index()
+        return res
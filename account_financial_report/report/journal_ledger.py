@@ -249,62 +249,231 @@ class JournalLedgerReport(models.AbstractModel):
             move_line_ids_taxes_data,
         )
 
-    def _get_journal_tax_lines(self, wizard, moves_data):
+    def _get_query_journal_taxes(self, lines_query, exigible_query):
+        """Aggregate the taxes summary of every journal in a single query.
+
+        A line contributes to each of the taxes it is linked to, either as
+        the tax line (`tax_line_id`) or as a base line (tax relation table).
+        Base amounts are only counted for exigible lines having base taxes,
+        and tax amounts only for exigible tax lines.
+        """
+        return """
+            WITH report_lines AS (
+                SELECT aml.id, aml.journal_id, aml.tax_line_id,
+                    aml.debit, aml.credit, aml.balance,
+                    aml.id IN ({exigible_query}) AS exigible,
+                    EXISTS (
+                        SELECT 1
+                        FROM account_move_line_account_tax_rel AS aml_at_rel
+                        WHERE aml_at_rel.account_move_line_id = aml.id
+                    ) AS has_taxes
+                FROM account_move_line AS aml
+                WHERE aml.id IN ({lines_query})
+            ), report_line_taxes AS (
+                SELECT id AS move_line_id, tax_line_id AS tax_id
+                FROM report_lines
+                WHERE tax_line_id IS NOT NULL
+                UNION
+                SELECT aml_at_rel.account_move_line_id, aml_at_rel.account_tax_id
+                FROM account_move_line_account_tax_rel AS aml_at_rel
+                JOIN report_lines
+                    ON report_lines.id = aml_at_rel.account_move_line_id
+            )
+            SELECT rl.journal_id, rlt.tax_id,
+                SUM(CASE WHEN rl.exigible AND rl.has_taxes
+                    THEN rl.debit ELSE 0.0 END) AS base_debit,
+                SUM(CASE WHEN rl.exigible AND rl.has_taxes
+                    THEN rl.credit ELSE 0.0 END) AS base_credit,
+                SUM(CASE WHEN rl.exigible AND rl.has_taxes
+                    THEN rl.balance ELSE 0.0 END) AS base_balance,
+                SUM(CASE WHEN rl.exigible AND rl.tax_line_id IS NOT NULL
+                    THEN rl.debit ELSE 0.0 END) AS tax_debit,
+                SUM(CASE WHEN rl.exigible AND rl.tax_line_id IS NOT NULL
+                    THEN rl.credit ELSE 0.0 END) AS tax_credit,
+                SUM(CASE WHEN rl.exigible AND rl.tax_line_id IS NOT NULL
+                    THEN rl.balance ELSE 0.0 END) AS tax_balance
+            FROM report_line_taxes AS rlt
+            JOIN report_lines AS rl ON rl.id = rlt.move_line_id
+            GROUP BY rl.journal_id, rlt.tax_id
+            ORDER BY rl.journal_id, rlt.tax_id
+        """.format(
+            lines_query=lines_query, exigible_query=exigible_query
+        )
+
+    def _get_journal_tax_lines(self, wizard, journal_ids):
+        """Return the taxes summary of each journal, computed in SQL from
+        the moves domain, so that it does not depend on the detail lines.
+        """
+        aml_model = self.env["account.move.line"]
+        moves_query = self.env["account.move"]._search(
+            self._get_moves_domain(wizard, journal_ids)
+        )
+        lines_domain = self._get_move_lines_domain(moves_query, wizard, journal_ids)
+        lines_query, lines_params = aml_model._search(lines_domain).subselect()
+        exigible_query, exigible_params = aml_model._search(
+            lines_domain + aml_model._get_tax_exigible_domain()
+        ).subselect()
+        self.env.cr.execute(
+            self._get_query_journal_taxes(lines_query, exigible_query),
+            exigible_params + lines_params,
+        )
+        rows = self.env.cr.dictfetchall()
+        taxes = self.env["account.tax"].browse({row["tax_id"] for row in rows})
+        taxes_data = {tax.id: tax for tax in taxes}
         journals_taxes_data = {}
+        for row in rows:
+            tax = taxes_data[row["tax_id"]]
+            journals_taxes_data.setdefault(row["journal_id"], []).append(
+                {
+                    "base_debit": row["base_debit"],
+                    "base_credit": row["base_credit"],
+                    "base_balance": row["base_balance"],
+                    "tax_debit": row["tax_debit"],
+                    "tax_credit": row["tax_credit"],
+                    "tax_balance": row["tax_balance"],
+                    "tax_name": tax.name,
+                    "tax_code": tax.description,
+                }
+            )
+        return journals_taxes_data
+
+    def _get_journal_ledger_values(self, wizard, journal_ledger_data, data):
+        """Build the moves, lines, totals and taxes summary of a single
+        journal, without loading the data of the other journals.
+        """
+        journal_ids = [journal_ledger_data["id"]]
+        taxes_summary_only = data.get("taxes_summary_only", False)
+        move_ids, moves_data, move_ids_data = [], [], {}
+        if not taxes_summary_only:
+            move_ids, moves_data, move_ids_data = self._get_moves(wizard, journal_ids)
+        move_lines_data = (
+            account_ids_data
+        ) = (
+            partner_ids_data
+        ) = currency_ids_data = tax_line_ids_data = move_line_ids_taxes_data = {}
+        if move_ids:
+            move_lines = self._get_move_lines(move_ids, wizard, journal_ids)
+            move_lines_data = move_lines[1]
+            account_ids_data = move_lines[2]
+            partner_ids_data = move_lines[3]
+            currency_ids_data = move_lines[4]
+            tax_line_ids_data = move_lines[5]
+            move_line_ids_taxes_data = move_lines[6]
         for move_data in moves_data:
-            report_move_lines = move_data["report_move_lines"]
-            for report_move_line in report_move_lines:
-                ml_data = report_move_line
-                tax_ids = []
-                if ml_data["tax_line_id"]:
-                    tax_ids.append(ml_data["tax_line_id"])
-                if ml_data["tax_ids"]:
-                    tax_ids += ml_data["tax_ids"]
-                tax_ids = list(set(tax_ids))
-                journal_id = ml_data["journal_id"]
-                if journal_id not in journals_taxes_data.keys():
-                    journals_taxes_data[journal_id] = {}
-                taxes = self.env["account.tax"].browse(tax_ids)
-                for tax in taxes:
-                    if tax.id not in journals_taxes_data[journal_id]:
-                        journals_taxes_data[journal_id][tax.id] = {
-                            "base_debit": 0.0,
-                            "base_credit": 0.0,
-                            "base_balance": 0.0,
-                            "tax_debit": 0.0,
-                            "tax_credit": 0.0,
-                            "tax_balance": 0.0,
-                            "tax_name": tax.name,
-                            "tax_code": tax.description,
-                        }
-                    field_keys = [
-                        "base_debit",
-                        "base_credit",
-                        "base_balance",
-                        "tax_debit",
-                        "tax_credit",
-                        "tax_balance",
-                    ]
-                    for field_key in field_keys:
-                        journals_taxes_data[journal_id][tax.id][field_key] += ml_data[
-                            field_key
-                        ]
-        journals_taxes_data_2 = {}
-        for journal_id in journals_taxes_data.keys():
-            journals_taxes_data_2[journal_id] = []
-            for tax_id in journals_taxes_data[journal_id].keys():
-                journals_taxes_data_2[journal_id] += [
-                    journals_taxes_data[journal_id][tax_id]
-                ]
-        return journals_taxes_data_2
+            move_data["report_move_lines"] = move_lines_data.get(
+                move_data["move_id"], []
+            )
+            for move_line_data in move_data["report_move_lines"]:
+                for item in ["debit", "credit"]:
+                    journal_ledger_data[item] += move_line_data[item]
+        journal_ledger_data["report_moves"] = moves_data
+        journal_ledger_data["tax_lines"] = self._get_journal_tax_lines(
+            wizard, journal_ids
+        ).get(journal_ledger_data["id"], [])
+        return {
+            "journal_ledger": journal_ledger_data,
+            "taxes_summary_only": taxes_summary_only,
+            "account_ids_data": account_ids_data,
+            "partner_ids_data": partner_ids_data,
+            "currency_ids_data": currency_ids_data,
+            "move_ids_data": move_ids_data,
+            "tax_line_data": tax_line_ids_data,
+            "move_line_ids_taxes_data": move_line_ids_taxes_data,
+        }
+
+    def _iter_journal_ledgers_values(self, wizard, data):
+        """Yield the values of each journal in report order.
+
+        Journals are processed one after the other and the record cache is
+        cleared between them, so the memory used while streaming a report
+        is bounded by the largest journal instead of the whole selection.
+        """
+        company = self.env["res.company"].browse(data["company_id"])
+        journal_ledgers_data = self._get_journal_ledgers(
+            wizard, data["journal_ids"], company
+        )
+        for journal_ledger_data in journal_ledgers_data:
+            yield self._get_journal_ledger_values(
+                wizard, dict(journal_ledger_data), data
+            )
+            self.env.invalidate_all()
+
+    def _iter_streamed_journal_ledgers(self, wizard, data, lookups):
+        """Yield the journals of the QWeb report one after the other.
+
+        Before each journal is yielded, the `lookups` dictionaries given to
+        the template are refilled with the accounts, partners, currencies,
+        moves and taxes of its lines only.
+        """
+        for values in self._iter_journal_ledgers_values(wizard, data):
+            for key, lookup in lookups.items():
+                lookup.clear()
+                lookup.update(values[key])
+            yield values["journal_ledger"]
+
+    def _get_report_common_values(self, data, company):
+        wizard_id = data["wizard_id"]
+        return {
+            "doc_ids": [wizard_id],
+            "doc_model": "journal.ledger.report.wizard",
+            "docs": self.env["journal.ledger.report.wizard"].browse(wizard_id),
+            "group_option": data["group_option"],
+            "foreign_currency": data["foreign_currency"],
+            "with_account_name": data["with_account_name"],
+            "company_name": company.display_name,
+            "currency_name": company.currency_id.name,
+            "date_from": data["date_from"],
+            "date_to": data["date_to"],
+            "move_target": data["move_target"],
+            "with_auto_sequence": data["with_auto_sequence"],
+            "taxes_summary_only": data.get("taxes_summary_only", False),
+        }
+
+    def _get_streamed_report_values(self, wizard, data, company):
+        """Values of the report grouped by journal where the journals are
+        built while the template renders them."""
+        lookups = {
+            key: {}
+            for key in (
+                "account_ids_data",
+                "partner_ids_data",
+                "currency_ids_data",
+                "move_ids_data",
+                "tax_line_data",
+                "move_line_ids_taxes_data",
+            )
+        }
+        return dict(
+            self._get_report_common_values(data, company),
+            Journal_Ledgers=self._iter_streamed_journal_ledgers(wizard, data, lookups),
+            Moves=[],
+            **lookups,
+        )
+
+    def _get_journal_totals(self, move_lines_data):
+        journal_totals = {}
+        for move_id in move_lines_data.keys():
+            for move_line_data in move_lines_data[move_id]:
+                journal_id = move_line_data["journal_id"]
+                if journal_id not in journal_totals.keys():
+                    journal_totals[journal_id] = {"debit": 0.0, "credit": 0.0}
+                for item in ["debit", "credit"]:
+                    journal_totals[journal_id][item] += move_line_data[item]
+        return journal_totals
 
     def _get_report_values(self, docids, data):
         wizard_id = data["wizard_id"]
         wizard = self.env["journal.ledger.report.wizard"].browse(wizard_id)
         company = self.env["res.company"].browse(data["company_id"])
+        if data["group_option"] == "journal" and data.get("stream_journals"):
+            return self._get_streamed_report_values(wizard, data, company)
         journal_ids = data["journal_ids"]
         journal_ledgers_data = self._get_journal_ledgers(wizard, journal_ids, company)
-        move_ids, moves_data, move_ids_data = self._get_moves(wizard, journal_ids)
+        taxes_summary_only = data.get("taxes_summary_only", False)
+        if taxes_summary_only:
+            move_ids, moves_data, move_ids_data = [], [], {}
+        else:
+            move_ids, moves_data, move_ids_data = self._get_moves(wizard, journal_ids)
         journal_moves_data = {}
         for key, items in itertools.groupby(
             moves_data, operator.itemgetter("journal_id")
@@ -324,25 +493,17 @@ class JournalLedgerReport(models.AbstractModel):
             partner_ids_data = move_lines[3]
             currency_ids_data = move_lines[4]
             tax_line_ids_data = move_lines[5]
+            move_line_ids_taxes_data = move_lines[6]
         for move_data in moves_data:
             move_id = move_data["move_id"]
             move_data["report_move_lines"] = []
             if move_id in move_lines_data.keys():
                 move_data["report_move_lines"] += move_lines_data[move_id]
-        journals_taxes_data = {}
-        if moves_data:
-            journals_taxes_data = self._get_journal_tax_lines(wizard, moves_data)
+        journals_taxes_data = self._get_journal_tax_lines(wizard, journal_ids)
         for journal_ledger_data in journal_ledgers_data:
             journal_id = journal_ledger_data["id"]
             journal_ledger_data["tax_lines"] = journals_taxes_data.get(journal_id, [])
-        journal_totals = {}
-        for move_id in move_lines_data.keys():
-            for move_line_data in move_lines_data[move_id]:
-                journal_id = move_line_data["journal_id"]
-                if journal_id not in journal_totals.keys():
-                    journal_totals[journal_id] = {"debit": 0.0, "credit": 0.0}
-                for item in ["debit", "credit"]:
-                    journal_totals[journal_id][item] += move_line_data[item]
+        journal_totals = self._get_journal_totals(move_lines_data)
         for journal_ledger_data in journal_ledgers_data:
             journal_id = journal_ledger_data["id"]
             if journal_id in journal_moves_data.keys():
@@ -352,25 +513,14 @@ class JournalLedgerReport(models.AbstractModel):
             if journal_id in journal_totals.keys():
                 for item in ["debit", "credit"]:
                     journal_ledger_data[item] += journal_totals[journal_id][item]
-        return {
-            "doc_ids": [wizard_id],
-            "doc_model": "journal.ledger.report.wizard",
-            "docs": self.env["journal.ledger.report.wizard"].browse(wizard_id),
-            "group_option": data["group_option"],
-            "foreign_currency": data["foreign_currency"],
-            "with_account_name": data["with_account_name"],
-            "company_name": company.display_name,
-            "currency_name": company.currency_id.name,
-            "date_from": data["date_from"],
-            "date_to": data["date_to"],
-            "move_target": data["move_target"],
-            "with_auto_sequence": data["with_auto_sequence"],
-            "account_ids_data": account_ids_data,
-            "partner_ids_data": partner_ids_data,
-            "currency_ids_data": currency_ids_data,
-            "move_ids_data": move_ids_data,
-            "tax_line_data": tax_line_ids_data,
-            "move_line_ids_taxes_data": move_line_ids_taxes_data,
-            "Journal_Ledgers": journal_ledgers_data,
-            "Moves": moves_data,
-        }
+        return dict(
+            self._get_report_common_values(data, company),
+            account_ids_data=account_ids_data,
+            partner_ids_data=partner_ids_data,
+            currency_ids_data=currency_ids_data,
+            move_ids_data=move_ids_data,
+            tax_line_data=tax_line_ids_data,
+            move_line_ids_taxes_data=move_line_ids_taxes_data,
+            Journal_Ledgers=journal_ledgers_data,
+            Moves=moves_data,
+        )
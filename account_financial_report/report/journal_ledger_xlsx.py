@@ -157,16 +157,16 @@ class JournalLedgerXslx(models.AbstractModel):
         ]
 
     def _generate_report_content(self, workbook, report, data, report_data):
-        res_data = self.env[
-            "report.account_financial_report.journal_ledger"
-        ]._get_report_values(report, data)
+        report_model = self.env["report.account_financial_report.journal_ledger"]
         group_option = report.group_option
         if group_option == "journal":
-            for ledger in res_data["Journal_Ledgers"]:
+            # Each journal sheet is written as soon as its data is built
+            for res_data in report_model._iter_journal_ledgers_values(report, data):
                 self._generate_journal_content(
-                    workbook, report, res_data, ledger, report_data
+                    workbook, report, res_data, res_data["journal_ledger"], report_data
                 )
         elif group_option == "none":
+            res_data = report_model._get_report_values(report, data)
             self._generate_no_group_content(workbook, report, res_data, report_data)
 
     def _generate_no_group_content(self, workbook, report, res_data, report_data):
@@ -185,9 +185,15 @@ class JournalLedgerXslx(models.AbstractModel):
             or journal.company_id.currency_id.name
         )
         sheet_name = "{} ({}) - {}".format(journal.code, currency_name, journal.name)
-        self._generate_moves_content(
-            workbook, sheet_name, report, res_data, ledger["report_moves"], report_data
-        )
+        if not res_data["taxes_summary_only"]:
+            self._generate_moves_content(
+                workbook,
+                sheet_name,
+                report,
+                res_data,
+                ledger["report_moves"],
+                report_data,
+            )
         self._generate_journal_taxes_summary(workbook, ledger, report_data)
 
     def _generate_no_group_taxes_summary(self, workbook, report, res_data, report_data):
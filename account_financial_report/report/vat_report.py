@@ -2,8 +2,6 @@
 # Copyright 2020 ForgeFlow S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
-import operator
-
 from odoo import api, fields, models
 
 
@@ -13,6 +11,7 @@ class VATReport(models.AbstractModel):
 
     def _get_tax_data(self, tax_ids):
         taxes = self.env["account.tax"].browse(tax_ids)
+        tags_index = self.env["account.tax"]._get_invoice_tags_index()
         tax_data = {}
         for tax in taxes:
             tax_data.update(
@@ -23,7 +22,7 @@ class VATReport(models.AbstractModel):
                         "tax_group_id": tax.tax_group_id.id,
                         "type_tax_use": tax.type_tax_use,
                         "amount_type": tax.amount_type,
-                        "tags_ids": tax.invoice_repartition_line_ids.tag_ids.ids,
+                        "tags_ids": list(tags_index.get(tax.id, ())),
                     }
                 }
             )
@@ -56,45 +55,105 @@ class VATReport(models.AbstractModel):
             domain += [("move_id.state", "in", ["posted", "draft"])]
         return domain
 
+    def _get_ml_fields_vat_report(self):
+        return [
+            "id",
+            "tax_base_amount",
+            "balance",
+            "tax_line_id",
+            "tax_ids",
+        ]
+
+    def _get_ml_aggregated_fields_vat_report(self):
+        """Fields of the journal items that the report queries aggregate, so
+        they are not added to their grouping."""
+        return ["id", "tax_base_amount", "balance", "tax_line_id", "tax_ids"]
+
+    def _get_ml_group_fields_vat_report(self):
+        """Columns of the journal items added to the grouping of the report
+        queries: the stored and groupable fields of _get_ml_fields_vat_report
+        other than the aggregated ones. Their values, ids for relational
+        fields, are given in the rows of the VAT data."""
+        aggregated = set(self._get_ml_aggregated_fields_vat_report())
+        aml_fields = self.env["account.move.line"]._fields
+        return [
+            fname
+            for fname in self._get_ml_fields_vat_report()
+            if fname not in aggregated
+            and aml_fields[fname].store
+            and aml_fields[fname].column_type
+        ]
+
+    def _get_ml_group_columns_vat_report(self):
+        return "".join(
+            ', "account_move_line".%s' % fname
+            for fname in self._get_ml_group_fields_vat_report()
+        )
+
+    def _get_tax_report_query(self, domain):
+        """Tax amounts grouped by tax, from the tax lines of the domain."""
+        query = self.env["account.move.line"]._search(domain)
+        tables, where_clause, where_params = query.get_sql()
+        group_columns = self._get_ml_group_columns_vat_report()
+        sql = """
+            SELECT "account_move_line".tax_line_id AS tax_id,
+                0.0 AS net, SUM("account_move_line".balance) AS tax
+                {group_columns}
+            FROM {tables}
+            WHERE {where_clause}
+            GROUP BY "account_move_line".tax_line_id {group_columns}
+        """.format(
+            tables=tables, where_clause=where_clause, group_columns=group_columns
+        )
+        return sql, where_params
+
+    def _get_net_report_query(self, domain):
+        """Base amounts grouped by tax, from the lines of the domain linked
+        to taxes through the move line/tax relation table."""
+        query = self.env["account.move.line"]._search(domain)
+        tables, where_clause, where_params = query.get_sql()
+        group_columns = self._get_ml_group_columns_vat_report()
+        sql = """
+            SELECT aml_at_rel.account_tax_id AS tax_id,
+                SUM("account_move_line".balance) AS net, 0.0 AS tax
+                {group_columns}
+            FROM {tables}
+            JOIN account_move_line_account_tax_rel AS aml_at_rel
+                ON aml_at_rel.account_move_line_id = "account_move_line".id
+            WHERE {where_clause}
+            GROUP BY aml_at_rel.account_tax_id {group_columns}
+        """.format(
+            tables=tables, where_clause=where_clause, group_columns=group_columns
+        )
+        return sql, where_params
+
     def _get_vat_report_data(self, company_id, date_from, date_to, only_posted_moves):
         tax_domain = self._get_tax_report_domain(
             company_id, date_from, date_to, only_posted_moves
         )
-        ml_fields = self._get_ml_fields_vat_report()
-        tax_move_lines = self.env["account.move.line"].search_read(
-            domain=tax_domain,
-            fields=ml_fields,
-        )
         net_domain = self._get_net_report_domain(
             company_id, date_from, date_to, only_posted_moves
         )
-        taxed_move_lines = self.env["account.move.line"].search_read(
-            domain=net_domain,
-            fields=ml_fields,
-        )
-        taxed_move_lines = list(filter(lambda d: d["tax_ids"], taxed_move_lines))
-        vat_data = []
-        for tax_move_line in tax_move_lines:
-            vat_data.append(
-                {
-                    "net": 0.0,
-                    "tax": tax_move_line["balance"],
-                    "tax_line_id": tax_move_line["tax_line_id"][0],
-                }
-            )
-        for taxed_move_line in taxed_move_lines:
-            for tax_id in taxed_move_line["tax_ids"]:
-                vat_data.append(
-                    {
-                        "net": taxed_move_line["balance"],
-                        "tax": 0.0,
-                        "tax_line_id": tax_id,
-                    }
-                )
-        tax_ids = list(map(operator.itemgetter("tax_line_id"), vat_data))
-        tax_ids = list(set(tax_ids))
-        tax_data = self._get_tax_data(tax_ids)
-        return vat_data, tax_data
+        group_fields = self._get_ml_group_fields_vat_report()
+        vat_data = {}
+        for sql, params in (
+            self._get_tax_report_query(tax_domain),
+            self._get_net_report_query(net_domain),
+        ):
+            self.env.cr.execute(sql, params)
+            for row in self.env.cr.dictfetchall():
+                key = (row["tax_id"],) + tuple(row[fname] for fname in group_fields)
+                if key not in vat_data:
+                    vat_data[key] = dict(
+                        {fname: row[fname] for fname in group_fields},
+                        net=0.0,
+                        tax=0.0,
+                        tax_line_id=row["tax_id"],
+                    )
+                vat_data[key]["net"] += row["net"]
+                vat_data[key]["tax"] += row["tax"]
+        tax_data = self._get_tax_data(list({key[0] for key in vat_data}))
+        return list(vat_data.values()), tax_data
 
     def _get_tax_group_data(self, tax_group_ids):
         tax_groups = self.env["account.tax.group"].browse(tax_group_ids)
@@ -138,6 +197,7 @@ class VATReport(models.AbstractModel):
         tax_group_data = self._get_tax_group_data(vat_report.keys())
         vat_report_list = []
         for tax_group_id in vat_report.keys():
+            vat_report[tax_group_id]["id"] = tax_group_id
             vat_report[tax_group_id]["name"] = tax_group_data[tax_group_id]["name"]
             vat_report[tax_group_id]["code"] = tax_group_data[tax_group_id]["code"]
             if tax_detail:
@@ -158,34 +218,28 @@ class VATReport(models.AbstractModel):
         return tags_data
 
     def _get_vat_report_tag_data(self, vat_report_data, tax_data, tax_detail):
+        # vat_report_data holds one row of totals per tax, so spreading them
+        # over the tags of each tax costs O(taxes x tags)
         vat_report = {}
-        for tax_move_line in vat_report_data:
-            tax_id = tax_move_line["tax_line_id"]
-            tags_ids = tax_data[tax_id]["tags_ids"]
+        for tax_totals in vat_report_data:
+            tax_id = tax_totals["tax_line_id"]
             if tax_data[tax_id]["amount_type"] == "group":
                 continue
-            else:
-                if tags_ids:
-                    for tag_id in tags_ids:
-                        if tag_id not in vat_report.keys():
-                            vat_report[tag_id] = {}
-                            vat_report[tag_id]["net"] = 0.0
-                            vat_report[tag_id]["tax"] = 0.0
-                            vat_report[tag_id][tax_id] = dict(tax_data[tax_id])
-                            vat_report[tag_id][tax_id].update({"net": 0.0, "tax": 0.0})
-                        else:
-                            if tax_id not in vat_report[tag_id].keys():
-                                vat_report[tag_id][tax_id] = dict(tax_data[tax_id])
-                                vat_report[tag_id][tax_id].update(
-                                    {"net": 0.0, "tax": 0.0}
-                                )
-                        vat_report[tag_id][tax_id]["net"] += tax_move_line["net"]
-                        vat_report[tag_id][tax_id]["tax"] += tax_move_line["tax"]
-                        vat_report[tag_id]["net"] += tax_move_line["net"]
-                        vat_report[tag_id]["tax"] += tax_move_line["tax"]
+            for tag_id in tax_data[tax_id]["tags_ids"]:
+                if tag_id not in vat_report:
+                    vat_report[tag_id] = {"net": 0.0, "tax": 0.0}
+                if tax_id not in vat_report[tag_id]:
+                    vat_report[tag_id][tax_id] = dict(
+                        tax_data[tax_id], net=0.0, tax=0.0
+                    )
+                vat_report[tag_id][tax_id]["net"] += tax_totals["net"]
+                vat_report[tag_id][tax_id]["tax"] += tax_totals["tax"]
+                vat_report[tag_id]["net"] += tax_totals["net"]
+                vat_report[tag_id]["tax"] += tax_totals["tax"]
         tags_data = self._get_tags_data(vat_report.keys())
         vat_report_list = []
         for tag_id in vat_report.keys():
+            vat_report[tag_id]["id"] = tag_id
             vat_report[tag_id]["name"] = tags_data[tag_id]["name"]
             vat_report[tag_id]["code"] = tags_data[tag_id]["code"]
             if tax_detail:
@@ -196,6 +250,143 @@ class VATReport(models.AbstractModel):
             vat_report_list.append(vat_report[tag_id])
         return vat_report_list
 
+    @api.model
+    def _get_comparison_domain(
+        self, company_ids, date_from, date_to, only_posted_moves
+    ):
+        domain = [
+            ("company_id", "in", company_ids),
+            ("date", ">=", date_from),
+            ("date", "<=", date_to),
+        ] + self.env["account.move.line"]._get_tax_exigible_domain()
+        if only_posted_moves:
+            domain += [("move_id.state", "=", "posted")]
+        else:
+            domain += [("move_id.state", "in", ["posted", "draft"])]
+        return domain
+
+    def _get_comparison_query(self, domain, periods):
+        """Net and tax amounts grouped by (company, period, tax) for all the
+        compared periods at once. Periods are identified by their index."""
+        query = self.env["account.move.line"]._search(domain)
+        tables, where_clause, where_params = query.get_sql()
+        periods_values = ", ".join(["(%s, %s::date, %s::date)"] * len(periods))
+        periods_params = []
+        for period_index, period in enumerate(periods):
+            periods_params += [period_index, period["date_from"], period["date_to"]]
+        sql = """
+            WITH periods (period_index, date_from, date_to) AS (
+                VALUES {periods_values}
+            ), report_lines AS (
+                SELECT "account_move_line".id, "account_move_line".company_id,
+                    "account_move_line".date, "account_move_line".balance,
+                    "account_move_line".tax_line_id
+                FROM {tables}
+                WHERE {where_clause}
+            )
+            SELECT rl.company_id, p.period_index, rl.tax_line_id AS tax_id,
+                0.0 AS net, SUM(rl.balance) AS tax
+            FROM report_lines AS rl
+            JOIN periods AS p ON rl.date BETWEEN p.date_from AND p.date_to
+            WHERE rl.tax_line_id IS NOT NULL
+            GROUP BY rl.company_id, p.period_index, rl.tax_line_id
+            UNION ALL
+            SELECT rl.company_id, p.period_index, aml_at_rel.account_tax_id,
+                SUM(rl.balance), 0.0
+            FROM report_lines AS rl
+            JOIN periods AS p ON rl.date BETWEEN p.date_from AND p.date_to
+            JOIN account_move_line_account_tax_rel AS aml_at_rel
+                ON aml_at_rel.account_move_line_id = rl.id
+            GROUP BY rl.company_id, p.period_index, aml_at_rel.account_tax_id
+        """.format(
+            periods_values=periods_values, tables=tables, where_clause=where_clause
+        )
+        return sql, periods_params + where_params
+
+    def _get_vat_comparison_data(self, data):
+        """Build a matrix of the tax groups or tags (rows) by company and
+        period (columns), each cell holding its net and tax amounts."""
+        companies = self.env["res.company"].browse(data["comparison_company_ids"])
+        periods = [
+            dict(
+                period,
+                date_from=fields.Date.from_string(period["date_from"]),
+                date_to=fields.Date.from_string(period["date_to"]),
+            )
+            for period in data["comparison_periods"]
+        ]
+        domain = self._get_comparison_domain(
+            companies.ids,
+            min(period["date_from"] for period in periods),
+            max(period["date_to"] for period in periods),
+            data["only_posted_moves"],
+        )
+        self.env.cr.execute(*self._get_comparison_query(domain, periods))
+        cells_data = {}
+        for row in self.env.cr.dictfetchall():
+            cell_data = cells_data.setdefault(
+                (row["company_id"], row["period_index"]), {}
+            )
+            tax_id = row["tax_id"]
+            if tax_id not in cell_data:
+                cell_data[tax_id] = {"net": 0.0, "tax": 0.0, "tax_line_id": tax_id}
+            cell_data[tax_id]["net"] += row["net"]
+            cell_data[tax_id]["tax"] += row["tax"]
+        tax_ids = {tax_id for cell_data in cells_data.values() for tax_id in cell_data}
+        tax_data = self._get_tax_data(list(tax_ids))
+        columns = [
+            {
+                "company_name": company.name,
+                "period_name": period["name"],
+                "currency": company.currency_id,
+                "key": (company.id, period_index),
+            }
+            for company in companies
+            for period_index, period in enumerate(periods)
+        ]
+        rows = {}
+        for column_index, column in enumerate(columns):
+            vat_data = list(cells_data.get(column["key"], {}).values())
+            if data["based_on"] == "taxgroups":
+                vat_report = self._get_vat_report_group_data(
+                    vat_data, tax_data, data["tax_detail"]
+                )
+            else:
+                vat_report = self._get_vat_report_tag_data(
+                    vat_data, tax_data, data["tax_detail"]
+                )
+            for tag_or_group in vat_report:
+                row = rows.setdefault(
+                    tag_or_group["id"],
+                    self._get_vat_comparison_row(tag_or_group, columns),
+                )
+                row["cells"][column_index] = {
+                    "net": tag_or_group["net"],
+                    "tax": tag_or_group["tax"],
+                }
+                for tax in tag_or_group.get("taxes", []):
+                    tax_row = row["taxes"].setdefault(
+                        tax["id"], self._get_vat_comparison_row(tax, columns)
+                    )
+                    tax_row["cells"][column_index] = {
+                        "net": tax["net"],
+                        "tax": tax["tax"],
+                    }
+        vat_comparison = []
+        for row in rows.values():
+            row["taxes"] = list(row["taxes"].values())
+            vat_comparison.append(row)
+        return columns, vat_comparison
+
+    def _get_vat_comparison_row(self, tag_group_or_tax, columns):
+        return {
+            "id": tag_group_or_tax["id"],
+            "code": tag_group_or_tax.get("code", ""),
+            "name": tag_group_or_tax["name"],
+            "cells": [{"net": 0.0, "tax": 0.0} for column in columns],
+            "taxes": {},
+        }
+
     def _get_report_values(self, docids, data):
         wizard_id = data["wizard_id"]
         company = self.env["res.company"].browse(data["company_id"])
@@ -205,17 +396,26 @@ class VATReport(models.AbstractModel):
         based_on = data["based_on"]
         tax_detail = data["tax_detail"]
         only_posted_moves = data["only_posted_moves"]
-        vat_report_data, tax_data = self._get_vat_report_data(
-            company_id, date_from, date_to, only_posted_moves
-        )
-        if based_on == "taxgroups":
-            vat_report = self._get_vat_report_group_data(
-                vat_report_data, tax_data, tax_detail
-            )
+        comparison = data.get("comparison", False)
+        comparison_columns = vat_comparison = vat_report = []
+        if comparison:
+            # The record rules of the journal items and the taxes only give
+            # access to the allowed companies: allow the compared ones
+            comparison_columns, vat_comparison = self.with_context(
+                allowed_company_ids=data["comparison_company_ids"]
+            )._get_vat_comparison_data(data)
         else:
-            vat_report = self._get_vat_report_tag_data(
-                vat_report_data, tax_data, tax_detail
+            vat_report_data, tax_data = self._get_vat_report_data(
+                company_id, date_from, date_to, only_posted_moves
             )
+            if based_on == "taxgroups":
+                vat_report = self._get_vat_report_group_data(
+                    vat_report_data, tax_data, tax_detail
+                )
+            else:
+                vat_report = self._get_vat_report_tag_data(
+                    vat_report_data, tax_data, tax_detail
+                )
         return {
             "doc_ids": [wizard_id],
             "doc_model": "vat.report.wizard",
@@ -231,13 +431,7 @@ class VATReport(models.AbstractModel):
             ).get(data["based_on"]),
             "tax_detail": data["tax_detail"],
             "vat_report": vat_report,
+            "comparison": comparison,
+            "comparison_columns": comparison_columns,
+            "vat_comparison": vat_comparison,
         }
-
-    def _get_ml_fields_vat_report(self):
-        return [
-            "id",
-            "tax_base_amount",
-            "balance",
-            "tax_line_id",
-            "tax_ids",
-        ]
@@ -20,6 +20,8 @@ class VATReportXslx(models.AbstractModel):
         return report_name
 
     def _get_report_columns(self, report):
+        if report.comparison:
+            return self._get_comparison_columns(report)
         return {
             0: {"header": _("Code"), "field": "code", "width": 5},
             1: {"header": _("Name"), "field": "name", "width": 100},
@@ -27,6 +29,34 @@ class VATReportXslx(models.AbstractModel):
             3: {"header": _("Tax"), "field": "tax", "type": "amount", "width": 14},
         }
 
+    def _get_comparison_columns(self, report):
+        columns = [
+            {"header": _("Code"), "field": "code", "width": 5},
+            {"header": _("Name"), "field": "name", "width": 50},
+        ]
+        column_index = 0
+        for company in report._get_comparison_companies():
+            for date_range in report._get_comparison_date_ranges():
+                prefix = "{} - {}".format(company.name, date_range.name)
+                columns += [
+                    {
+                        "header": _("%s Net") % prefix,
+                        "field": "net_%s" % column_index,
+                        "type": "amount",
+                        "currency_id": company.currency_id,
+                        "width": 14,
+                    },
+                    {
+                        "header": _("%s Tax") % prefix,
+                        "field": "tax_%s" % column_index,
+                        "type": "amount",
+                        "currency_id": company.currency_id,
+                        "width": 14,
+                    },
+                ]
+                column_index += 1
+        return dict(enumerate(columns))
+
     def _get_report_filters(self, report):
         return [
             [_("Date from"), report.date_from.strftime("%d/%m/%Y")],
@@ -47,6 +77,9 @@ class VATReportXslx(models.AbstractModel):
         res_data = self.env[
             "report.account_financial_report.vat_report"
         ]._get_report_values(report, data)
+        if res_data["comparison"]:
+            self._generate_comparison_content(res_data, report_data)
+            return
         vat_report = res_data["vat_report"]
         tax_detail = res_data["tax_detail"]
         # For each tax_tag tax_group
@@ -59,3 +92,52 @@ class VATReportXslx(models.AbstractModel):
             if tax_detail:
                 for tax in tag_or_group["taxes"]:
                     self.write_line_from_dict(tax, report_data)
+
+    def _generate_comparison_content(self, res_data, report_data):
+        self.write_array_header(report_data)
+        for tag_or_group in res_data["vat_comparison"]:
+            self._write_comparison_line(
+                self._get_comparison_line(tag_or_group), report_data
+            )
+            if res_data["tax_detail"]:
+                for tax in tag_or_group["taxes"]:
+                    self._write_comparison_line(
+                        self._get_comparison_line(tax), report_data
+                    )
+
+    def _get_comparison_amount_format(self, currency, report_data):
+        """Amount format of the currency of a compared company, created once
+        for the workbook."""
+        amount_formats = report_data.setdefault("comparison_amount_formats", {})
+        if currency not in amount_formats:
+            amount_formats[currency] = self._get_currency_amt_format_dict(
+                {"currency_id": currency}, report_data
+            )
+        return amount_formats[currency]
+
+    def _write_comparison_line(self, line, report_data):
+        """Write a line of the comparison, each amount in the currency of the
+        company of its column."""
+        for col_pos, column in report_data["columns"].items():
+            value = line.get(column["field"], False)
+            if column.get("type") == "amount":
+                report_data["sheet"].write_number(
+                    report_data["row_pos"],
+                    col_pos,
+                    float(value),
+                    self._get_comparison_amount_format(
+                        column["currency_id"], report_data
+                    ),
+                )
+            else:
+                report_data["sheet"].write_string(
+                    report_data["row_pos"], col_pos, value or ""
+                )
+        report_data["row_pos"] += 1
+
+    def _get_comparison_line(self, row):
+        line = {"code": row["code"], "name": row["name"]}
+        for column_index, cell in enumerate(row["cells"]):
+            line["net_%s" % column_index] = cell["net"]
+            line["tax_%s" % column_index] = cell["tax"]
+        return line
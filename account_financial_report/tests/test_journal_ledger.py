@@ -3,6 +3,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 from datetime import datetime
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 
@@ -281,3 +282,176 @@ class TestJournalReport(AccountTestInvoicingCommon):
 
         self.check_report_journal_debit_credit(res_data, 250, 250)
         self.check_report_journal_debit_credit_taxes(res_data, 300, 0, 50, 0)
+
+    def test_04_test_taxes_summary_only(self):
+        move_form = Form(
+            self.env["account.move"].with_context(default_move_type="out_invoice")
+        )
+        move_form.partner_id = self.partner_2
+        move_form.journal_id = self.journal_sale
+        with move_form.invoice_line_ids.new() as line_form:
+            line_form.name = "test"
+            line_form.quantity = 1.0
+            line_form.price_unit = 100
+            line_form.account_id = self.income_account
+            line_form.tax_ids.add(self.tax_15_s)
+            line_form.tax_ids.add(self.tax_20_s)
+        invoice = move_form.save()
+        invoice.action_post()
+
+        wiz = self.JournalLedgerReportWizard.create(
+            {
+                "date_from": self.fy_date_start,
+                "date_to": self.fy_date_end,
+                "company_id": self.company.id,
+                "journal_ids": [(6, 0, self.journal_sale.ids)],
+                "move_target": "all",
+                "taxes_summary_only": True,
+            }
+        )
+        data = wiz._prepare_report_journal_ledger()
+        res_data = self.JournalLedgerReport._get_report_values(wiz, data)
+        self.assertFalse(res_data["Moves"])
+        self.check_report_journal_debit_credit(res_data, 0, 0)
+        self.check_report_journal_debit_credit_taxes(res_data, 0, 200, 0, 35)
+
+    def test_05_test_iter_journal_ledgers_values(self):
+        today_date = Date.today()
+        self._add_move(today_date, self.journal_sale, 0, 100, 100, 0)
+        self._add_move(today_date, self.journal_purchase, 0, 50, 50, 0)
+
+        wiz = self.JournalLedgerReportWizard.create(
+            {
+                "date_from": self.fy_date_start,
+                "date_to": self.fy_date_end,
+                "company_id": self.company.id,
+                "journal_ids": [
+                    (6, 0, (self.journal_sale | self.journal_purchase).ids)
+                ],
+                "move_target": "all",
+            }
+        )
+        data = wiz._prepare_report_journal_ledger()
+        res_data = self.JournalLedgerReport._get_report_values(wiz, data)
+        journals_values = list(
+            self.JournalLedgerReport._iter_journal_ledgers_values(wiz, data)
+        )
+        self.assertEqual(
+            [rec["id"] for rec in res_data["Journal_Ledgers"]],
+            [rec["journal_ledger"]["id"] for rec in journals_values],
+        )
+        for rec, journal_values in zip(res_data["Journal_Ledgers"], journals_values):
+            ledger = journal_values["journal_ledger"]
+            self.assertEqual(rec["debit"], ledger["debit"])
+            self.assertEqual(rec["credit"], ledger["credit"])
+            self.assertEqual(len(rec["report_moves"]), len(ledger["report_moves"]))
+
+    def test_06_test_streamed_report_values(self):
+        today_date = Date.today()
+        self._add_move(today_date, self.journal_sale, 0, 100, 100, 0)
+        self._add_move(today_date, self.journal_purchase, 0, 50, 50, 0)
+        wiz = self.JournalLedgerReportWizard.create(
+            {
+                "date_from": self.fy_date_start,
+                "date_to": self.fy_date_end,
+                "company_id": self.company.id,
+                "journal_ids": [
+                    (6, 0, (self.journal_sale | self.journal_purchase).ids)
+                ],
+                "move_target": "all",
+                "group_option": "journal",
+            }
+        )
+        data = wiz._prepare_report_journal_ledger()
+        res_data = self.JournalLedgerReport._get_report_values(wiz, data)
+        streamed_data = self.JournalLedgerReport._get_report_values(
+            wiz, dict(data, stream_journals=True)
+        )
+        expected = [
+            (rec["id"], rec["debit"], rec["credit"], len(rec["report_moves"]))
+            for rec in res_data["Journal_Ledgers"]
+        ]
+        streamed = []
+        for rec in streamed_data["Journal_Ledgers"]:
+            streamed.append(
+                (rec["id"], rec["debit"], rec["credit"], len(rec["report_moves"]))
+            )
+            # The lookups hold the data of the lines of the current journal
+            self.assertEqual(
+                set(streamed_data["move_ids_data"]),
+                {move["move_id"] for move in rec["report_moves"]},
+            )
+        self.assertEqual(streamed, expected)
+        html = self.env["ir.actions.report"]._render_qweb_html(
+            "account_financial_report.journal_ledger",
+            wiz.ids,
+            data=dict(data, stream_journals=True),
+        )[0]
+        self.assertIn(self.journal_sale.name.encode(), html)
+        self.assertIn(self.journal_purchase.name.encode(), html)
+
+    def _get_taxes_descriptions(self, wiz, res_data, journal_ledger):
+        return {
+            line["move_line_id"]: wiz._get_ml_tax_description(
+                line,
+                res_data["tax_line_data"].get(line["tax_line_id"]),
+                res_data["move_line_ids_taxes_data"].get(line["move_line_id"]),
+            )
+            for move in journal_ledger["report_moves"]
+            for line in move["report_move_lines"]
+        }
+
+    def test_07_test_taxes_description_by_journal(self):
+        move_form = Form(
+            self.env["account.move"].with_context(default_move_type="out_invoice")
+        )
+        move_form.partner_id = self.partner_2
+        move_form.journal_id = self.journal_sale
+        with move_form.invoice_line_ids.new() as line_form:
+            line_form.name = "test"
+            line_form.quantity = 1.0
+            line_form.price_unit = 100
+            line_form.account_id = self.income_account
+            line_form.tax_ids.add(self.tax_15_s)
+        invoice = move_form.save()
+        invoice.action_post()
+        wiz = self.JournalLedgerReportWizard.create(
+            {
+                "date_from": self.fy_date_start,
+                "date_to": self.fy_date_end,
+                "company_id": self.company.id,
+                "journal_ids": [(6, 0, self.journal_sale.ids)],
+                "move_target": "all",
+                "group_option": "journal",
+            }
+        )
+        data = wiz._prepare_report_journal_ledger()
+        base_line = invoice.invoice_line_ids
+        expected = self.tax_15_s.description or self.tax_15_s.name
+        # Streamed PDF/HTML path
+        streamed_data = self.JournalLedgerReport._get_report_values(
+            wiz, dict(data, stream_journals=True)
+        )
+        for journal_ledger in streamed_data["Journal_Ledgers"]:
+            descriptions = self._get_taxes_descriptions(
+                wiz, streamed_data, journal_ledger
+            )
+            self.assertEqual(descriptions[base_line.id], expected)
+        # XLSX path
+        xlsx_model = self.env["report.a_f_r.report_journal_ledger_xlsx"].with_context(
+            active_model=wiz._name
+        )
+        write_line = type(xlsx_model).write_line_from_dict
+        with patch.object(
+            type(xlsx_model),
+            "write_line_from_dict",
+            autospec=True,
+            side_effect=write_line,
+        ) as mock:
+            xlsx_model.create_xlsx_report(wiz.ids, data)
+        descriptions = {
+            call.args[1]["move_line_id"]: call.args[1]["taxes_description"]
+            for call in mock.call_args_list
+            if "taxes_description" in call.args[1]
+        }
+        self.assertEqual(descriptions[base_line.id], expected)
@@ -4,6 +4,7 @@
 
 import time
 from datetime import date
+from unittest.mock import patch
 
 from odoo import fields
 from odoo.tests import tagged
@@ -395,3 +396,141 @@ class TestVATReport(AccountTestInvoicingCommon):
         wizard.button_export_html()
         wizard.button_export_pdf()
         wizard.button_export_xlsx()
+
+    def test_invoice_tags_index(self):
+        tags_index = self.env["account.tax"]._get_invoice_tags_index()
+        self.assertEqual(
+            tags_index[self.tax_10.id], (self.tax_tag_01.id, self.tax_tag_02.id)
+        )
+        repartition_line = self.tax_10.invoice_repartition_line_ids.filtered(
+            lambda line: line.repartition_type == "tax"
+        )
+        repartition_line.tag_ids = [(6, 0, self.tax_tag_03.ids)]
+        tags_index = self.env["account.tax"]._get_invoice_tags_index()
+        self.assertEqual(tags_index[self.tax_10.id], (self.tax_tag_03.id,))
+        # Archiving a tag removes it from the index
+        self.tax_tag_03.active = False
+        self.env.invalidate_all()
+        tags_index = self.env["account.tax"]._get_invoice_tags_index()
+        self.assertEqual(tags_index.get(self.tax_10.id, ()), ())
+        self.tax_tag_03.active = True
+        res_data = self._get_report_lines()
+        tax_10_net, tax_10_tax = self._get_tax_line(
+            self.tax_10.name, res_data["vat_report"]
+        )
+        self.assertEqual(tax_10_net, -100)
+        self.assertEqual(tax_10_tax, -10)
+        self.assertFalse(
+            self.check_tag_or_group_in_report(
+                self.tax_tag_01.name, res_data["vat_report"]
+            )
+        )
+
+    def test_ml_fields_vat_report(self):
+        report_model = self.env["report.account_financial_report.vat_report"]
+        vat_data, __ = report_model._get_vat_report_data(
+            self.company.id, self.date_from, self.date_to, True
+        )
+        ml_fields = report_model._get_ml_fields_vat_report() + [
+            "journal_id",
+            "tax_tag_ids",
+        ]
+        with patch.object(
+            type(report_model), "_get_ml_fields_vat_report", return_value=ml_fields
+        ):
+            # The many2many fields cannot be grouped
+            self.assertEqual(
+                report_model._get_ml_group_fields_vat_report(), ["journal_id"]
+            )
+            vat_data_by_journal, __ = report_model._get_vat_report_data(
+                self.company.id, self.date_from, self.date_to, True
+            )
+        self.assertTrue(vat_data_by_journal)
+        for row in vat_data_by_journal:
+            self.assertIsInstance(row["journal_id"], int)
+        for tax_id in {row["tax_line_id"] for row in vat_data}:
+            for amount in ("net", "tax"):
+                self.assertAlmostEqual(
+                    sum(
+                        row[amount] for row in vat_data if row["tax_line_id"] == tax_id
+                    ),
+                    sum(
+                        row[amount]
+                        for row in vat_data_by_journal
+                        if row["tax_line_id"] == tax_id
+                    ),
+                )
+
+    def test_comparison(self):
+        date_range_type = self.env["date.range.type"].create(
+            {"name": "Fortnight", "company_id": False, "allow_overlap": False}
+        )
+        first_half = self.env["date.range"].create(
+            {
+                "name": "First half",
+                "date_start": time.strftime("%Y-%m-01"),
+                "date_end": time.strftime("%Y-%m-14"),
+                "type_id": date_range_type.id,
+            }
+        )
+        second_half = self.env["date.range"].create(
+            {
+                "name": "Second half",
+                "date_start": time.strftime("%Y-%m-15"),
+                "date_end": time.strftime("%Y-%m-28"),
+                "type_id": date_range_type.id,
+            }
+        )
+        wizard = self.env["vat.report.wizard"].create(
+            {
+                "date_from": self.date_from,
+                "date_to": self.date_to,
+                "company_id": self.company.id,
+                "based_on": "taxgroups",
+                "tax_detail": True,
+                "comparison": True,
+                "comparison_date_range_ids": [(6, 0, [second_half.id, first_half.id])],
+            }
+        )
+        data = wizard._prepare_vat_report()
+        res_data = self.env[
+            "report.account_financial_report.vat_report"
+        ]._get_report_values(wizard, data)
+        self.assertEqual(
+            [column["period_name"] for column in res_data["comparison_columns"]],
+            ["First half", "Second half"],
+        )
+        rows = {row["name"]: row for row in res_data["vat_comparison"]}
+        group_10_cells = rows[self.tax_group_10.name]["cells"]
+        self.assertEqual(group_10_cells[0], {"net": -100, "tax": -10})
+        self.assertEqual(group_10_cells[1], {"net": 0.0, "tax": 0.0})
+        group_20_taxes = rows[self.tax_group_20.name]["taxes"]
+        self.assertEqual(group_20_taxes[0]["name"], self.tax_20.name)
+        self.assertEqual(group_20_taxes[0]["cells"][0], {"net": -250, "tax": -50})
+        # The compared companies are reported when they are not the active ones
+        res_data = (
+            self.env["report.account_financial_report.vat_report"]
+            .with_company(self.company_data_2["company"])
+            ._get_report_values(wizard, data)
+        )
+        rows = {row["name"]: row for row in res_data["vat_comparison"]}
+        self.assertEqual(
+            rows[self.tax_group_10.name]["cells"][0], {"net": -100, "tax": -10}
+        )
+        # The amounts of the comparison use the currency of their company
+        xlsx_model = self.env["report.a_f_r.report_vat_report_xlsx"].with_context(
+            active_model=wizard._name
+        )
+        amount_format = type(xlsx_model)._get_comparison_amount_format
+        with patch.object(
+            type(xlsx_model),
+            "_get_comparison_amount_format",
+            autospec=True,
+            side_effect=amount_format,
+        ) as mock:
+            xlsx_model.create_xlsx_report(wizard.ids, data)
+        self.assertEqual(
+            {call.args[1] for call in mock.call_args_list}, {self.company.currency_id}
+        )
+        wizard.button_export_html()
+        wizard.button_export_xlsx()
@@ -35,6 +35,12 @@ class JournalLedgerReportWizard(models.TransientModel):
     )
     with_account_name = fields.Boolean(default=False)
     with_auto_sequence = fields.Boolean(string="Show Auto Sequence", default=False)
+    taxes_summary_only = fields.Boolean(
+        string="Only Taxes Summary",
+        default=False,
+        help="Skip the journal entries details and only print the taxes "
+        "summary of each journal.",
+    )
 
     @api.model
     def _get_move_targets(self):
@@ -80,6 +86,8 @@ class JournalLedgerReportWizard(models.TransientModel):
             report_name = "a_f_r.report_journal_ledger_xlsx"
         else:
             report_name = "account_financial_report.journal_ledger"
+            # Render the journals one at a time instead of loading them all
+            data["stream_journals"] = True
         return (
             self.env["ir.actions.report"]
             .search(
@@ -110,6 +118,7 @@ class JournalLedgerReportWizard(models.TransientModel):
             "with_account_name": self.with_account_name,
             "account_financial_report_lang": self.env.lang,
             "with_auto_sequence": self.with_auto_sequence,
+            "taxes_summary_only": self.taxes_summary_only,
         }
 
     def _export(self, report_type):
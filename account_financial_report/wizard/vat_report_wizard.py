@@ -25,6 +25,20 @@ class VATReportWizard(models.TransientModel):
         required=True,
         default="posted",
     )
+    comparison = fields.Boolean(
+        string="Compare Periods and Companies",
+        help="Compute the report for several periods and companies at once "
+        "and display them side by side.",
+    )
+    comparison_date_range_ids = fields.Many2many(
+        comodel_name="date.range", string="Compared Periods"
+    )
+    comparison_company_ids = fields.Many2many(
+        comodel_name="res.company",
+        string="Compared Companies",
+        domain=lambda self: [("id", "in", self.env.user.company_ids.ids)],
+        help="Leave empty to only compare the periods of the report company.",
+    )
 
     @api.onchange("company_id")
     def onchange_company_id(self):
@@ -51,6 +65,31 @@ class VATReportWizard(models.TransientModel):
         self.date_from = self.date_range_id.date_start
         self.date_to = self.date_range_id.date_end
 
+    @api.onchange("comparison_date_range_ids")
+    def onchange_comparison_date_range_ids(self):
+        """Make the report dates span all the compared periods."""
+        if self.comparison_date_range_ids:
+            self.date_from = min(self.comparison_date_range_ids.mapped("date_start"))
+            self.date_to = max(self.comparison_date_range_ids.mapped("date_end"))
+
+    @api.constrains("comparison", "comparison_date_range_ids")
+    def _check_comparison_date_range_ids(self):
+        for rec in self:
+            if rec.comparison and not rec.comparison_date_range_ids:
+                raise ValidationError(
+                    _("At least one period is needed to compare VAT amounts.")
+                )
+
+    def _get_comparison_companies(self):
+        self.ensure_one()
+        return self.comparison_company_ids or self.company_id
+
+    def _get_comparison_date_ranges(self):
+        self.ensure_one()
+        return self.comparison_date_range_ids.sorted(
+            lambda date_range: (date_range.date_start, date_range.id)
+        )
+
     @api.constrains("company_id", "date_range_id")
     def _check_company_id_date_range_id(self):
         for rec in self.sudo():
@@ -93,6 +132,16 @@ class VATReportWizard(models.TransientModel):
             "only_posted_moves": self.target_move == "posted",
             "tax_detail": self.tax_detail,
             "account_financial_report_lang": self.env.lang,
+            "comparison": self.comparison,
+            "comparison_company_ids": self._get_comparison_companies().ids,
+            "comparison_periods": [
+                {
+                    "name": date_range.name,
+                    "date_from": date_range.date_start,
+                    "date_to": date_range.date_end,
+                }
+                for date_range in self._get_comparison_date_ranges()
+            ],
         }
 
     def _export(self, report_type):
@@ -63,18 +63,100 @@ class StockMove(models.Model):
             )
         return super().get_quantity_invoiced(invoice_lines)
 
-    def _set_not_invoiced_values(self, qty_to_invoice, invoiced_qty):
+    def _get_quantities_invoiced(self, invoice_lines):
+        """Share between the purchase moves of the vendor bill lines the totals
+        of the lines and of the moves, and the split of the invoiced quantity
+        when it differs from the received one."""
+        purchase_moves = self.filtered("purchase_line_id")
+        res = super(StockMove, self - purchase_moves)._get_quantities_invoiced(
+            invoice_lines
+        )
+        if not purchase_moves:
+            return res
+        if not invoice_lines:
+            res.update(dict.fromkeys(purchase_moves.ids, 0))
+            return res
+        # Invoiced quantity of the bill lines for the receipts and the refunds
+        signed_quantities = {False: 0.0, True: 0.0}
+        for line in invoice_lines:
+            move_type = line.move_id.move_type
+            signed_quantities[False] += (
+                line.quantity if move_type == "in_invoice" else -line.quantity
+            )
+            signed_quantities[True] += (
+                line.quantity if move_type == "in_refund" else -line.quantity
+            )
+        # Check when grouping different moves in an invoice line
+        moves = invoice_lines.mapped("move_line_ids")
+        date_start = self.env.context.get("moves_date_start")
+        date_end = self.env.context.get("moves_date_end")
+        if date_start and date_end:
+            moves = moves.filtered(
+                lambda ml: ml.state == "done"
+                and (ml.date_done >= date_start and ml.date_done <= date_end)
+            )
+        total_qty = moves.get_total_devolution_moves()
+        split_quantities = {}
+        for move in purchase_moves:
+            qty_invoiced = abs(signed_quantities[bool(move.to_refund)])
+            if qty_invoiced == total_qty:
+                res[move.id] = (
+                    move.quantity_done
+                    if not move.check_is_return()
+                    else -move.quantity_done
+                )
+                continue
+            if qty_invoiced not in split_quantities:
+                split_quantities[qty_invoiced] = moves._split_quantity_invoiced(
+                    qty_invoiced
+                )
+            res[move.id] = split_quantities[qty_invoiced].get(move.id, 0)
+        return res
+
+    def _split_quantity_invoiced(self, qty_invoiced):
+        """Return {move_id: quantity} splitting `qty_invoiced` between the
+        moves in their order."""
+        res = {}
+        invoiced = 0.0
+        for move in self:
+            qty = (
+                move.quantity_done
+                if move.quantity_done <= (qty_invoiced - invoiced)
+                else qty_invoiced - invoiced
+            )
+            if move.check_is_return():
+                qty = -qty
+            res.setdefault(move.id, qty)
+            invoiced += qty
+        return res
+
+    def _get_not_invoiced_price_units(self):
+        """Read the price units of the purchase lines once for all the moves"""
+        purchase_moves = self.filtered("purchase_line_id")
+        res = super(StockMove, self - purchase_moves)._get_not_invoiced_price_units()
+        purchase_lines = purchase_moves.purchase_line_id
+        fnames = ["price_unit"]
+        if "discount" in purchase_lines._fields:
+            fnames.append("discount")
+        price_units = {
+            vals["id"]: vals["price_unit"] * (1 - vals.get("discount", 0.0) / 100)
+            for vals in purchase_lines.read(fnames)
+        }
+        for move in purchase_moves:
+            res[move.id] = price_units[move.purchase_line_id.id]
+        return res
+
+    def _set_not_invoiced_values(self, qty_to_invoice, invoiced_qty, price_unit=None):
         self.ensure_one()
         if self.purchase_line_id:
+            if price_unit is None:
+                price_unit = self._get_not_invoiced_price_units()[self.id]
             self.quantity_not_invoiced = qty_to_invoice - invoiced_qty
-            price_unit = self.purchase_line_id.price_unit
-            if "discount" in self.purchase_line_id._fields:
-                price_unit = self.purchase_line_id.price_unit * (
-                    1 - self.purchase_line_id.discount / 100
-                )
             self.price_not_invoiced = (qty_to_invoice - invoiced_qty) * price_unit
         else:
-            return super()._set_not_invoiced_values(qty_to_invoice, invoiced_qty)
+            return super()._set_not_invoiced_values(
+                qty_to_invoice, invoiced_qty, price_unit=price_unit
+            )
 
     @api.depends("purchase_line_id")
     @api.depends_context("date_check_invoiced_moves")
@@ -28,13 +28,16 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
         picking.button_validate()
         return picking
 
+    def _get_report_move_ids(self, action):
+        return self.env[action["res_model"]].search(action["domain"]).move_id.ids
+
     def test_01_report_move_not_invoiced(self):
         picking = self.get_picking_done_po()
         wiz = self.env["account.sale.stock.report.non.billed.wiz"].create(
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertIn(move.id, domain_ids)
             self.assertEqual(move.currency_id, move.purchase_line_id.currency_id)
@@ -49,7 +52,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
 
@@ -75,7 +78,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         self.assertNotIn(move_done.id, domain_ids)
         for move in moves_not_done:
             self.assertIn(move.id, domain_ids)
@@ -97,7 +100,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         # Refund invoice
@@ -114,7 +117,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
         )
         wiz_invoice_refund.reverse_moves()
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertIn(move.id, domain_ids)
         # Create invoice again
@@ -123,7 +126,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
         new_invoice.invoice_date = self.po.create_date
         new_invoice.action_post()
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
 
@@ -147,7 +150,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in move_lines:
             self.assertIn(move.id, domain_ids)
         inv_action = self.po.action_create_invoice()
@@ -155,7 +158,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
         invoice.invoice_date = self.po.create_date
         invoice.action_post()
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in move_lines:
             self.assertNotIn(move.id, domain_ids)
 
@@ -182,7 +185,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in move_lines:
             self.assertNotIn(move.id, domain_ids)
         for move in picking.move_ids:
@@ -192,7 +195,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
         invoice.invoice_date = self.po.create_date
         invoice.action_post()
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in move_lines + picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
 
@@ -213,7 +216,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         # Return move
@@ -267,7 +270,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -307,7 +310,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -353,7 +356,7 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -378,6 +381,35 @@ class TestAccountPurchaseStockReportNonBilled(common.TransactionCase):
             {"date_check": fields.Date.today(), "interval_restrict_invoices": True}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertIn(move.id, domain_ids)
+
+    def test_12_not_invoiced_values(self):
+        picking = self.get_picking_done_po()
+        moves = picking.move_ids.with_context(
+            non_billed_date=fields.Date.today(),
+            non_billed_date_start=fields.Date.today() - relativedelta(days=1),
+        )
+        self.assertEqual(
+            moves._get_not_invoiced_price_units(),
+            {move.id: 15.0 for move in moves},
+        )
+        for move in moves:
+            self.assertEqual(move.quantity_not_invoiced, 1.0)
+            self.assertAlmostEqual(move.price_not_invoiced, 15.0)
+        # Partially invoiced receipt
+        inv_action = self.po.action_create_invoice()
+        invoice = self.env["account.move"].browse([(inv_action["res_id"])])
+        invoice.invoice_date = fields.Date.today()
+        invoice.invoice_line_ids.quantity = 0.4
+        invoice.action_post()
+        invoice_lines = moves.invoice_line_ids
+        self.assertEqual(
+            moves._get_quantities_invoiced(invoice_lines),
+            {move.id: move.get_quantity_invoiced(invoice_lines) for move in moves},
+        )
+        moves.invalidate_recordset(["quantity_not_invoiced", "price_not_invoiced"])
+        for move in moves:
+            self.assertAlmostEqual(move.quantity_not_invoiced, 0.6)
+            self.assertAlmostEqual(move.price_not_invoiced, 9.0)
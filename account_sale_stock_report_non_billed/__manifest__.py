@@ -9,8 +9,8 @@
     "depends": ["stock_picking_invoice_link"],
     "data": [
         "views/res_config_settings_views.xml",
-        "views/stock_move_non_billed_views.xml",
         "security/ir.model.access.csv",
+        "security/security.xml",
         "wizard/account_sale_stock_report_non_billed_wiz_views.xml",
     ],
     "installable": True,
@@ -7,21 +7,47 @@ from odoo import models
 class StockMove(models.Model):
     _inherit = "account.move.line"
 
-    def check_invoice_line_in_date(self, date_check, date_start=False):
+    def _get_invoice_dates(self):
+        """Return the date of the invoice of the lines as {line_id: date},
+        taking the invoice date, the accounting date or the creation date of
+        the line, read in a single query for all the lines."""
+        lines = self.filtered("id")
+        if not lines:
+            return {}
+        self.env["account.move"].flush_model(["invoice_date", "date"])
+        self.flush_model(["move_id"])
+        self.env.cr.execute(
+            """
+            SELECT aml.id, COALESCE(am.invoice_date, am.date, aml.create_date::date)
+            FROM account_move_line aml
+            JOIN account_move am ON am.id = aml.move_id
+            WHERE aml.id IN %s
+            """,
+            (tuple(lines.ids),),
+        )
+        return dict(self.env.cr.fetchall())
+
+    def _get_invoice_date(self):
         self.ensure_one()
-        start = True
-        if date_start:
-            start = (
-                self.move_id.invoice_date
-                or self.move_id.date
-                or self.create_date.date()
-            ) >= date_start
-        return (
-            start
-            and (
-                self.move_id.invoice_date
-                or self.move_id.date
-                or self.create_date.date()
+        return self.move_id.invoice_date or self.move_id.date or self.create_date.date()
+
+    def filter_invoice_lines_in_date(self, date_check, date_start=False):
+        """Return the lines whose invoice date is between `date_start`, when
+        given, and `date_check`. The dates of the lines not saved yet are
+        read from the cache."""
+        invoice_dates = self._get_invoice_dates()
+
+        def in_date(line):
+            invoice_date = invoice_dates.get(line.id) or line._get_invoice_date()
+            return (not date_start or invoice_date >= date_start) and (
+                invoice_date <= date_check
             )
-            <= date_check
+
+        return self.filtered(in_date)
+
+    def check_invoice_line_in_date(self, date_check, date_start=False):
+        self.ensure_one()
+        invoice_date = self._get_invoice_date()
+        return (not date_start or invoice_date >= date_start) and (
+            invoice_date <= date_check
         )
@@ -1,6 +1,8 @@
 # Copyright 2022 Tecnativa - Carlos Roca
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
 
+from collections import defaultdict
+
 from odoo import api, fields, models
 
 
@@ -25,6 +27,11 @@ class StockMove(models.Model):
     date_done = fields.Date(
         string="Effective Date", compute="_compute_date_done", store=True
     )
+    is_return_move = fields.Boolean(
+        compute="_compute_is_return_move",
+        recursive=True,
+        help="The move returns a move that is not itself a return.",
+    )
 
     @api.depends("picking_id.date_done")
     def _compute_date_done(self):
@@ -43,12 +50,47 @@ class StockMove(models.Model):
             if move.sale_line_id:
                 move.currency_id = move.sale_line_id.currency_id
 
+    def _get_return_parity(self):
+        """Return {move_id: is_return} for the moves, following their chains of
+        returned moves with one recursive query. A move is a return when its
+        chain of returned moves has an odd length."""
+        if not self:
+            return {}
+        self.flush_model(["origin_returned_move_id"])
+        self.env.cr.execute(
+            """
+            WITH RECURSIVE chain(id, origin_id) AS (
+                SELECT id, origin_returned_move_id
+                FROM stock_move
+                WHERE id IN %s
+                UNION ALL
+                SELECT chain.id, sm.origin_returned_move_id
+                FROM chain
+                JOIN stock_move sm ON sm.id = chain.origin_id
+            )
+            SELECT id, count(origin_id) % 2 = 1
+            FROM chain
+            GROUP BY id
+            """,
+            (tuple(self.ids),),
+        )
+        return dict(self.env.cr.fetchall())
+
+    @api.depends("origin_returned_move_id.is_return_move")
+    def _compute_is_return_move(self):
+        moves = self.filtered(lambda m: isinstance(m.id, int))
+        parity = moves._get_return_parity()
+        for move in moves:
+            move.is_return_move = parity.get(move.id, False)
+        for move in self - moves:
+            move.is_return_move = (
+                bool(move.origin_returned_move_id)
+                and not move.origin_returned_move_id.is_return_move
+            )
+
     def check_is_return(self):
         self.ensure_one()
-        if not self.origin_returned_move_id:
-            return False
-        else:
-            return not self.origin_returned_move_id.check_is_return()
+        return self.is_return_move
 
     def get_total_devolution_moves(self):
         total_qty = 0
@@ -100,97 +142,93 @@ class StockMove(models.Model):
             return 0
         return self.quantity_done if not self.check_is_return() else -self.quantity_done
 
-    def _set_not_invoiced_values(self, qty_to_invoice, invoiced_qty):
+    def _get_quantities_invoiced(self, invoice_lines):
+        """Return {move_id: invoiced quantity} for the moves, all of them
+        invoiced by the same `invoice_lines`. To be overwritten to share the
+        computation between the moves of the invoice lines."""
+        return {move.id: move.get_quantity_invoiced(invoice_lines) for move in self}
+
+    def _get_not_invoiced_price_units(self):
+        """Return {move_id: price unit} used to value the quantities to invoice"""
+        return {move.id: move.sale_line_id.price_reduce for move in self}
+
+    def _set_not_invoiced_values(self, qty_to_invoice, invoiced_qty, price_unit=None):
         self.ensure_one()
+        if price_unit is None:
+            price_unit = self.sale_line_id.price_reduce
         self.quantity_not_invoiced = qty_to_invoice - invoiced_qty
-        self.price_not_invoiced = (
-            qty_to_invoice - invoiced_qty
-        ) * self.sale_line_id.price_reduce
+        self.price_not_invoiced = (qty_to_invoice - invoiced_qty) * price_unit
+
+    def _get_not_invoiced_quantities(
+        self, date_start, date_end, invoice_date_start=False
+    ):
+        """Return the quantity to invoice and the quantity invoiced of the moves
+        at `date_end` as {move_id: (qty_to_invoice, invoiced_qty)}.
+
+        The invoice lines of all the moves, the moves of these invoice lines and
+        their own invoice lines are loaded and filtered once for the whole
+        recordset, so that each move only combines records already in cache.
+        """
+        invoice_lines = self.invoice_line_ids.filtered(
+            lambda line: line.move_id.state != "cancel"
+        )
+        moves_in_date = invoice_lines.move_line_ids.filtered(
+            lambda m: m.state == "done"
+            and m.date_done >= date_start
+            and m.date_done <= date_end
+        )
+        lines_in_date = moves_in_date.invoice_line_ids.filter_invoice_lines_in_date(
+            date_end, date_start=invoice_date_start
+        )
+        # Moves sharing the same invoice lines get their invoiced quantities
+        # at once
+        moves_by_lines = defaultdict(list)
+        moves = self.with_context(moves_date_start=date_start, moves_date_end=date_end)
+        for move in moves:
+            inv_lines = (
+                (move.invoice_line_ids & invoice_lines).move_line_ids & moves_in_date
+            ).invoice_line_ids & lines_in_date
+            moves_by_lines[inv_lines].append(move.id)
+        invoiced = {}
+        for inv_lines, move_ids in moves_by_lines.items():
+            invoiced.update(moves.browse(move_ids)._get_quantities_invoiced(inv_lines))
+        res = {}
+        for move in moves:
+            qty_to_invoice = (
+                move.quantity_done
+                if not move.check_is_return()
+                else -move.quantity_done
+            )
+            res[move.id] = (qty_to_invoice, invoiced[move.id])
+        return res
 
     @api.depends("sale_line_id")
     @api.depends_context(
         "non_billed_date", "non_billed_date_start", "non_billed_invoice_date_start"
     )
     def _compute_not_invoiced_values(self):
-        for move in self:
-            context = self.env.context
-            if not context.get("non_billed_date") or not context.get(
-                "non_billed_date_start"
-            ):
-                move.quantity_not_invoiced = 0
-                move.price_not_invoiced = 0
-                continue
-            date_start = fields.Date.from_string(context["non_billed_date_start"])
-            date_end = fields.Date.from_string(context["non_billed_date"])
-            invoices_not_cancel = move.invoice_line_ids.filtered(
-                lambda l: l.move_id.state != "cancel"
-            )
-            moves_in_date = invoices_not_cancel.mapped("move_line_ids").filtered(
-                lambda m: m.state == "done"
-                and m.date_done >= date_start
-                and m.date_done <= date_end
-            )
-            invoice_date_start = False
-            if context.get("non_billed_invoice_date_start"):
-                invoice_date_start = fields.Date.from_string(
-                    context["non_billed_invoice_date_start"]
-                )
-            inv_lines = moves_in_date.mapped("invoice_line_ids").filtered(
-                lambda l: l.check_invoice_line_in_date(
-                    date_end,
-                    date_start=invoice_date_start,
-                )
-            )
-            qty_to_invoice = (
-                move.quantity_done
-                if not move.check_is_return()
-                else -move.quantity_done
+        context = self.env.context
+        if not context.get("non_billed_date") or not context.get(
+            "non_billed_date_start"
+        ):
+            self.quantity_not_invoiced = 0
+            self.price_not_invoiced = 0
+            return
+        invoice_date_start = False
+        if context.get("non_billed_invoice_date_start"):
+            invoice_date_start = fields.Date.from_string(
+                context["non_billed_invoice_date_start"]
             )
-            calculated_qty = move.with_context(
-                moves_date_start=date_start,
-                moves_date_end=date_end,
-            ).get_quantity_invoiced(inv_lines)
-            move._set_not_invoiced_values(qty_to_invoice, calculated_qty)
-
-    @api.model
-    def read_group(
-        self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True
-    ):
-        """Method to add the computed values 'quantity_not_invoiced' and
-        'price_not_invoiced' to the result. Without doing it we get an error when trying
-        to get the info on a pivot view.
-        As the fields are not stored, before call super() method we had to remove
-        the keys from 'fields' argument to avoid errors.
-        """
-        aux_fields = []
-        if "quantity_not_invoiced:sum" in fields:
-            aux_fields.append("quantity_not_invoiced:sum")
-            fields.remove("quantity_not_invoiced:sum")
-        if "price_not_invoiced:sum" in fields:
-            aux_fields.append("price_not_invoiced:sum")
-            fields.remove("price_not_invoiced:sum")
-        res = super().read_group(
-            domain,
-            fields,
-            groupby,
-            offset=offset,
-            limit=limit,
-            orderby=orderby,
-            lazy=lazy,
+        quantities = self._get_not_invoiced_quantities(
+            fields.Date.from_string(context["non_billed_date_start"]),
+            fields.Date.from_string(context["non_billed_date"]),
+            invoice_date_start=invoice_date_start,
         )
-        qty_not_inv = "quantity_not_invoiced:sum" in aux_fields
-        price_not_inv = "price_not_invoiced:sum" in aux_fields
-        if qty_not_inv or price_not_inv:
-            for line in res:
-                quantity = 0.0
-                price = 0.0
-                moves = self.search(line.get("__domain", domain))
-                for move in moves:
-                    quantity += move.quantity_not_invoiced if qty_not_inv else 0.0
-                    price += move.price_not_invoiced if price_not_inv else 0.0
-                line["quantity_not_invoiced"] = quantity
-                line["price_not_invoiced"] = price
-        return res
+        price_units = self._get_not_invoiced_price_units()
+        for move in self:
+            move._set_not_invoiced_values(
+                *quantities[move.id], price_unit=price_units[move.id]
+            )
 
     def _get_model_id_origin_document(self):
         if not self.sale_line_id:
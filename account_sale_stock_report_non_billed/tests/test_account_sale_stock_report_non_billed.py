@@ -3,7 +3,7 @@
 from dateutil.relativedelta import relativedelta
 
 from odoo import fields
-from odoo.tests import Form, tagged
+from odoo.tests import Form, new_test_user, tagged
 
 from odoo.addons.stock_picking_invoice_link.tests.test_stock_picking_invoice_link import (
     TestStockPickingInvoiceLink,
@@ -25,13 +25,16 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
         picking.button_validate()
         return picking
 
+    def _get_report_move_ids(self, action):
+        return self.env[action["res_model"]].search(action["domain"]).move_id.ids
+
     def test_01_report_move_not_invoiced(self):
         pick_1 = self.get_picking_done_so()
         wiz = self.env["account.sale.stock.report.non.billed.wiz"].create(
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in pick_1.move_ids:
             self.assertIn(move.id, domain_ids)
 
@@ -43,7 +46,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in pick_1.move_ids:
             self.assertNotIn(move.id, domain_ids)
 
@@ -72,7 +75,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         self.assertNotIn(move_done.id, domain_ids)
         for move in moves_not_done:
             self.assertIn(move.id, domain_ids)
@@ -98,7 +101,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in pick_1.move_ids:
             self.assertIn(move.id, domain_ids)
 
@@ -118,7 +121,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -142,7 +145,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -150,7 +153,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
         inv = self.so._create_invoices(final=True)
         inv.action_post()
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking_return.move_ids:
             self.assertNotIn(move.id, domain_ids)
 
@@ -181,7 +184,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -215,7 +218,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -254,7 +257,7 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today()}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertNotIn(move.id, domain_ids)
         for move in picking_return.move_ids:
@@ -276,6 +279,120 @@ class TestAccountSaleStrockReportNonBilled(TestStockPickingInvoiceLink):
             {"date_check": fields.Date.today(), "interval_restrict_invoices": True}
         )
         action = wiz.open_at_date()
-        domain_ids = action["domain"][0][2]
+        domain_ids = self._get_report_move_ids(action)
         for move in picking.move_ids:
             self.assertIn(move.id, domain_ids)
+
+    def test_11_not_invoiced_values(self):
+        picking = self.get_picking_done_so()
+        moves = picking.move_ids.with_context(
+            non_billed_date=fields.Date.today(),
+            non_billed_date_start=fields.Date.today() - relativedelta(days=1),
+        )
+        quantities = moves._get_not_invoiced_quantities(
+            fields.Date.today() - relativedelta(days=1), fields.Date.today()
+        )
+        for move in moves:
+            self.assertEqual(quantities[move.id], (move.quantity_done, 0))
+            self.assertEqual(move.quantity_not_invoiced, move.quantity_done)
+            self.assertAlmostEqual(
+                move.price_not_invoiced,
+                move.quantity_done * move.sale_line_id.price_reduce,
+            )
+        inv = self.so._create_invoices()
+        inv.action_post()
+        moves.invalidate_recordset(["quantity_not_invoiced", "price_not_invoiced"])
+        for move in moves:
+            self.assertEqual(move.quantity_not_invoiced, 0)
+            self.assertEqual(move.price_not_invoiced, 0)
+
+    def test_13_return_parity(self):
+        picking = self.get_picking_done_so()
+        pickings = picking
+        for _i in range(3):
+            wiz_return = Form(
+                self.env["stock.return.picking"].with_context(
+                    active_model="stock.picking", active_id=pickings[-1].id
+                )
+            ).save()
+            picking_return = self.env["stock.picking"].browse(
+                wiz_return.create_returns()["res_id"]
+            )
+            picking_return.move_line_ids.write({"qty_done": 2})
+            picking_return.button_validate()
+            pickings |= picking_return
+        moves = pickings.move_ids
+        parity = moves._get_return_parity()
+        for index, pick in enumerate(pickings):
+            for move in pick.move_ids:
+                self.assertEqual(parity[move.id], bool(index % 2))
+                self.assertEqual(move.check_is_return(), bool(index % 2))
+
+    def test_14_report_lines(self):
+        picking = self.get_picking_done_so()
+        line_model = self.env["account.sale.stock.report.non.billed.line"]
+        wiz = self.env["account.sale.stock.report.non.billed.wiz"].create(
+            {"date_check": fields.Date.today()}
+        )
+        action = wiz.open_at_date()
+        self.assertEqual(action["res_model"], line_model._name)
+        self.assertEqual(action["domain"], [("user_id", "=", self.env.uid)])
+        lines = line_model.search(action["domain"]).filtered(
+            lambda line: line.move_id in picking.move_ids
+        )
+        self.assertEqual(lines.move_id, picking.move_ids)
+        for line in lines:
+            self.assertEqual(line.quantity_not_invoiced, line.move_id.quantity_done)
+            self.assertAlmostEqual(
+                line.price_not_invoiced,
+                line.move_id.quantity_done * line.move_id.sale_line_id.price_reduce,
+            )
+            self.assertEqual(line.partner_id, picking.partner_id)
+        # The lines are kept with the wizard gone, until the next run of the
+        # same user, which does not replace the lines of the other users
+        other_line = line_model.create(
+            {
+                "user_id": new_test_user(self.env, login="non_billed_user").id,
+                "move_id": picking.move_ids[0].id,
+            }
+        )
+        wiz.unlink()
+        self.assertTrue(lines.exists())
+        inv = self.so._create_invoices()
+        inv.action_post()
+        wiz = self.env["account.sale.stock.report.non.billed.wiz"].create(
+            {"date_check": fields.Date.today()}
+        )
+        action = wiz.open_at_date()
+        self.assertFalse(lines.exists())
+        self.assertTrue(other_line.exists())
+        self.assertFalse(line_model.search(action["domain"]).move_id & picking.move_ids)
+
+    def test_15_invoice_lines_in_date(self):
+        self.get_picking_done_so()
+        inv = self.so._create_invoices()
+        inv.invoice_date = fields.Date.today() - relativedelta(days=2)
+        inv.action_post()
+        lines = inv.invoice_line_ids
+        today = fields.Date.today()
+        self.assertEqual(
+            lines._get_invoice_dates(), {line.id: inv.invoice_date for line in lines}
+        )
+        self.assertEqual(lines.filter_invoice_lines_in_date(today), lines)
+        self.assertFalse(lines.filter_invoice_lines_in_date(today, date_start=today))
+        self.assertEqual(
+            lines.filter_invoice_lines_in_date(
+                today, date_start=today - relativedelta(days=2)
+            ),
+            lines,
+        )
+        self.assertFalse(
+            lines.filter_invoice_lines_in_date(today - relativedelta(days=3))
+        )
+        self.assertTrue(lines[0].check_invoice_line_in_date(today))
+        self.assertFalse(lines[0].check_invoice_line_in_date(today, date_start=today))
+        # The lines not saved yet take the dates of their invoice
+        new_line = self.env["account.move.line"].new({"move_id": inv.id})
+        self.assertEqual(
+            (lines | new_line).filter_invoice_lines_in_date(today), lines | new_line
+        )
@@ -1 +1,2 @@
 from . import account_sale_stock_report_non_billed_wiz
+from . import account_sale_stock_report_non_billed_line
@@ -0,0 +1,48 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+
+from odoo import fields, models
+
+
+class AccountSaleStockReportNonBilledLine(models.Model):
+    """Non billed values of a stock move saved by the wizard, so that the
+    report views read them instead of computing them again.
+
+    The lines are the snapshot of the last run of the wizard by their user:
+    they are kept while the report is open or exported, and replaced by the
+    next run of the wizard by the same user.
+    """
+
+    _name = "account.sale.stock.report.non.billed.line"
+    _description = "Non billed stock move at a date"
+    _order = "date_done, id"
+
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        required=True,
+        default=lambda self: self.env.user,
+        ondelete="cascade",
+        index=True,
+    )
+    move_id = fields.Many2one(
+        comodel_name="stock.move",
+        string="Stock Move",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    picking_id = fields.Many2one(comodel_name="stock.picking", string="Picking")
+    partner_id = fields.Many2one(comodel_name="res.partner", string="Partner")
+    product_id = fields.Many2one(comodel_name="product.product", string="Product")
+    date_done = fields.Date(string="Effective Date")
+    origin = fields.Char(string="Source Document")
+    quantity_not_invoiced = fields.Float(
+        string="Qty. to invoice", digits="Product Unit of Measure"
+    )
+    price_not_invoiced = fields.Float(
+        string="Amount to invoice", digits="Product Price"
+    )
+    currency_id = fields.Many2one(comodel_name="res.currency")
+
+    def open_origin_document(self):
+        self.ensure_one()
+        return self.move_id.open_origin_document()
@@ -42,91 +42,106 @@ class AccountSaleStockReportNonBilledWiz(models.TransientModel):
 
     @api.model
     def _get_neutralized_moves(self, stock_moves):
-        neutralized_moves = self.env["stock.move"]
+        dp = self.env["decimal.precision"].precision_get("Product Unit of Measure")
+        date_start = (
+            self.stock_move_non_billed_threshold
+            if self.interval_restrict_invoices
+            else False
+        )
+        returned = {
+            group["origin_returned_move_id"][0]: (
+                group["quantity_done"],
+                group["returned_ids"],
+            )
+            for group in self.env["stock.move"].read_group(
+                [("origin_returned_move_id", "in", stock_moves.ids)],
+                ["quantity_done:sum", "returned_ids:array_agg(id)"],
+                ["origin_returned_move_id"],
+            )
+        }
+        returned_moves = self.env["stock.move"].browse(
+            {move_id for __, move_ids in returned.values() for move_id in move_ids}
+        )
+        # Moves having an invoice line in the dates
+        invoiced_move_ids = set(
+            (stock_moves | returned_moves)
+            .invoice_line_ids.filter_invoice_lines_in_date(
+                self.date_check, date_start=date_start
+            )
+            .move_line_ids.ids
+        )
+        neutralized_move_ids = set()
         for move in stock_moves.sorted("origin_returned_move_id"):
             # Not show returns that not update qty on stock
             if move.origin_returned_move_id and not move.to_refund:
-                neutralized_moves |= move
-            if move in neutralized_moves:
+                neutralized_move_ids.add(move.id)
+            if move.id in neutralized_move_ids:
                 continue
-            dp = self.env["decimal.precision"].precision_get("Product Unit of Measure")
-            date_start = (
-                self.stock_move_non_billed_threshold
-                if self.interval_restrict_invoices
-                else False
-            )
+            returned_qty, returned_ids = returned.get(move.id, (0.0, []))
             if float_is_zero(
-                move.quantity_done
-                - sum(move.returned_move_ids.mapped("quantity_done")),
-                precision_digits=dp,
-            ) and not (
-                move.invoice_line_ids
-                + move.returned_move_ids.mapped("invoice_line_ids")
-            ).filtered(
-                lambda l: l.check_invoice_line_in_date(
-                    self.date_check, date_start=date_start
-                )
-            ):
-                neutralized_moves |= move + move.returned_move_ids
-        return neutralized_moves
+                move.quantity_done - returned_qty, precision_digits=dp
+            ) and invoiced_move_ids.isdisjoint([move.id] + returned_ids):
+                neutralized_move_ids.add(move.id)
+                neutralized_move_ids.update(returned_ids)
+        return self.env["stock.move"].browse(neutralized_move_ids)
+
+    def _get_non_billed_context(self):
+        context = dict(
+            self.env.context,
+            non_billed_date=self.date_check,
+            non_billed_date_start=self.stock_move_non_billed_threshold,
+        )
+        if self.interval_restrict_invoices:
+            context = dict(
+                context,
+                non_billed_invoice_date_start=self.stock_move_non_billed_threshold,
+            )
+        return context
+
+    def _prepare_line_vals(self, move):
+        return {
+            "user_id": self.env.uid,
+            "move_id": move.id,
+            "picking_id": move.picking_id.id,
+            "partner_id": (move.picking_id.partner_id or move.partner_id).id,
+            "product_id": move.product_id.id,
+            "date_done": move.date_done,
+            "origin": move.origin,
+            "quantity_not_invoiced": move.quantity_not_invoiced,
+            "price_not_invoiced": move.price_not_invoiced,
+            "currency_id": move.currency_id.id,
+        }
 
     def open_at_date(self):
+        """Save the non billed moves and their values in lines of the user,
+        replacing the lines of the previous run, and open the report on
+        these lines."""
+        self.ensure_one()
         dp = self.env["decimal.precision"].precision_get("Product Unit of Measure")
         # Get the moves after the threshold
         domain = self._get_search_domain()
         stock_moves = self.env["stock.move"].search(domain)
         stock_moves = self.discart_kits_from_moves(stock_moves)
         stock_moves -= self._get_neutralized_moves(stock_moves)
-        final_stock_move_ids = []
-        date_start = (
-            self.stock_move_non_billed_threshold
-            if self.interval_restrict_invoices
-            else False
+        stock_moves = stock_moves.with_context(**self._get_non_billed_context())
+        line_model = self.env["account.sale.stock.report.non.billed.line"]
+        line_model.search([("user_id", "=", self.env.uid)]).unlink()
+        line_model.create(
+            [
+                self._prepare_line_vals(move)
+                for move in stock_moves
+                if not float_is_zero(move.quantity_not_invoiced, precision_digits=dp)
+            ]
         )
-        for move in stock_moves:
-            inv_lines_not_cancel = move.invoice_line_ids.filtered(
-                lambda l: l.move_id.state != "cancel"
-            )
-            moves_in_date = inv_lines_not_cancel.move_line_ids.filtered(
-                lambda m: m.state == "done"
-                and m.date_done >= self.stock_move_non_billed_threshold
-                and m.date_done <= self.date_check
-            )
-            inv_lines = moves_in_date.invoice_line_ids.filtered(
-                lambda l: l.check_invoice_line_in_date(
-                    self.date_check, date_start=date_start
-                )
-            )
-            qty_to_invoice = (
-                move.quantity_done
-                if not move.check_is_return()
-                else -move.quantity_done
-            )
-            calculated_qty = move.with_context(
-                moves_date_start=self.stock_move_non_billed_threshold,
-                moves_date_end=self.date_check,
-            ).get_quantity_invoiced(inv_lines)
-            if not float_is_zero(qty_to_invoice - calculated_qty, precision_digits=dp):
-                final_stock_move_ids.append(move.id)
         tree_view_id = self.env.ref(
-            "account_sale_stock_report_non_billed.view_move_tree"
+            "account_sale_stock_report_non_billed.view_non_billed_line_tree"
         ).id
         pivot_view_id = self.env.ref(
-            "account_sale_stock_report_non_billed.view_move_pivot_no_invoiced"
+            "account_sale_stock_report_non_billed.view_non_billed_line_pivot"
         ).id
         search_view_id = self.env.ref(
-            "account_sale_stock_report_non_billed.view_move_search"
+            "account_sale_stock_report_non_billed.view_non_billed_line_search"
         ).id
-        context = dict(
-            self.env.context,
-            non_billed_date=self.date_check,
-            non_billed_date_start=self.stock_move_non_billed_threshold,
-        )
-        if self.interval_restrict_invoices:
-            context = dict(
-                context,
-                non_billed_invoice_date_start=self.stock_move_non_billed_threshold,
-            )
         action = {
             "type": "ir.actions.act_window",
             "views": [(tree_view_id, "tree"), (pivot_view_id, "pivot")],
@@ -134,8 +149,8 @@ class AccountSaleStockReportNonBilledWiz(models.TransientModel):
             "search_view_id": search_view_id,
             "name": _("Non billed moves (%(from)s -> %(to)s)")
             % {"from": self.stock_move_non_billed_threshold, "to": self.date_check},
-            "res_model": "stock.move",
-            "domain": [("id", "in", final_stock_move_ids)],
-            "context": context,
+            "res_model": "account.sale.stock.report.non.billed.line",
+            "domain": [("user_id", "=", self.env.uid)],
+            "context": self.env.context,
         }
         return action
@@ -1,47 +1,131 @@
 # Copyright 2020 Opener B.V. <https://opener.amsterdam>
 # Copyright 2020 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import argparse
 import logging
 
+import psycopg2
 from psycopg2 import sql
 
+_logger = logging.getLogger(__name__)
+
+# Number of account_move ids handled by each backfill transaction
+CHUNK_SIZE = 50000
+
+# Financial type, account type of the lines and comparison of their balance
+# to 0, in order of precedence. Also used by account.move to compute the
+# financial type of large batches of moves in SQL.
+MAPPING = [
+    ("liquidity", "asset_cash", False),
+    ("liquidity", "liability_credit_card", False),
+    ("payable", "liability_payable", "<"),
+    ("payable_refund", "liability_payable", ">="),
+    ("receivable", "asset_receivable", ">"),
+    ("receivable_refund", "asset_receivable", "<="),
+    ("other", False, False),
+]
+
+
+def backfill_financial_type(cr, chunk_size=CHUNK_SIZE, commit=None):
+    """Add account_move.financial_type if needed and fill it on the moves
+    where it is not set yet. Note that the order of the mapping is important
+    as one move can have move lines on accounts of multiple types and the
+    move type is set in the order of precedence.
+
+    Moves are processed by ranges of `chunk_size` ids. When a `commit`
+    callable is given, it is called after each range so that a large
+    database is not updated in a single transaction. As only the moves
+    without financial_type are updated, an interrupted backfill resumes
+    where it stopped.
+    """
+    _logger.info("Add account_move.financial_type column if it does not yet exist")
+    cr.execute(
+        "ALTER TABLE account_move ADD COLUMN IF NOT EXISTS financial_type VARCHAR"
+    )
+    if commit:
+        commit()
+    cr.execute("SELECT MIN(id), MAX(id) FROM account_move WHERE financial_type IS NULL")
+    min_id, max_id = cr.fetchone()
+    if min_id is None:
+        _logger.info("financial_type is already set on all moves")
+        return
+    for start_id in range(min_id, max_id + 1, chunk_size):
+        end_id = min(start_id + chunk_size - 1, max_id)
+        for financial_type, account_type, balance_operator in MAPPING:
+            args = [financial_type]
+            query = sql.SQL("UPDATE account_move am SET financial_type = %s")
+            if account_type:
+                query += sql.SQL(
+                    """FROM account_move_line aml
+                    WHERE aml.account_id IN (
+                        SELECT id FROM account_account
+                        WHERE account_type = %s)
+                    AND aml.move_id = am.id AND am.financial_type IS NULL
+                    """
+                )
+                args.append(account_type)
+            else:
+                query += sql.SQL("WHERE am.financial_type IS NULL")
+            if balance_operator:
+                query += sql.SQL(" AND aml.balance {} 0").format(
+                    sql.SQL(balance_operator)
+                )
+            query += sql.SQL(" AND am.id BETWEEN %s AND %s")
+            args += [start_id, end_id]
+            cr.execute(query, tuple(args))
+            _logger.info(
+                "%s move set to type %s in ids %s-%s",
+                cr.rowcount,
+                financial_type,
+                start_id,
+                end_id,
+            )
+        if commit:
+            commit()
+        _logger.info(
+            "financial_type backfill: %d%% done (ids up to %s of %s)",
+            (end_id - min_id + 1) * 100 // (max_id - min_id + 1),
+            end_id,
+            max_id,
+        )
+
 
 def pre_init_hook(cr):
     """Precreate financial_type and fill with appropriate values to prevent
     a MemoryError when the ORM attempts to call its compute method on a large
-    amount of preexisting moves. Note that the order of the mapping is
-    important as one move can have move lines on accounts of multiple types
-    and the move type is set in the order of precedence."""
-    logger = logging.getLogger(__name__)
-    logger.info("Add account_move.financial_type column if it does not yet exist")
-    cr.execute(
-        "ALTER TABLE account_move ADD COLUMN IF NOT EXISTS financial_type VARCHAR"
+    amount of preexisting moves.
+
+    The backfill runs in the transaction of the installation, so that a
+    failed installation leaves the database untouched. On large databases,
+    run this file as a script beforehand to fill the column with intermediate
+    commits, the hook then only has the remaining moves to process.
+    """
+    backfill_financial_type(cr)
+
+
+def main():
+    """Pre-populate account_move.financial_type before installing the module,
+    while the database stays online. Usage:
+
+        python hooks.py "dbname=odoo user=odoo" --chunk-size 50000
+    """
+    parser = argparse.ArgumentParser(
+        description="Fill account_move.financial_type by chunks of moves."
     )
-    MAPPING = [
-        ("liquidity", "asset_cash", False),
-        ("liquidity", "liability_credit_card", False),
-        ("payable", "liability_payable", "AND aml.balance < 0"),
-        ("payable_refund", "liability_payable", "AND aml.balance >= 0"),
-        ("receivable", "asset_receivable", "AND aml.balance > 0"),
-        ("receivable_refund", "asset_receivable", "AND aml.balance <= 0"),
-        ("other", False, False),
-    ]
-    for financial_type, account_type, extra_where in MAPPING:
-        args = [financial_type]
-        query = sql.SQL("UPDATE account_move am SET financial_type = %s")
-        if account_type:
-            query += sql.SQL(
-                """FROM account_move_line aml
-                WHERE aml.account_id IN (
-                    SELECT id FROM account_account
-                    WHERE account_type = %s)
-                AND aml.move_id = am.id AND am.financial_type IS NULL
-                """
+    parser.add_argument("dsn", help="PostgreSQL connection string")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    connection = psycopg2.connect(args.dsn)
+    try:
+        with connection.cursor() as cr:
+            backfill_financial_type(
+                cr, chunk_size=args.chunk_size, commit=connection.commit
             )
-            args.append(account_type)
-        else:
-            query += sql.SQL("WHERE am.financial_type IS NULL")
-        if extra_where:
-            query += sql.SQL(extra_where)
-        cr.execute(query, tuple(args))
-        logger.info("%s move set to type %s", financial_type, cr.rowcount)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,3 +3,5 @@
 from . import account_move
 from . import account_tax
 from . import account_move_line
+from . import account_tax_balance_cache
+from . import account_tax_repartition_line
@@ -3,10 +3,15 @@
 
 from odoo import _, api, fields, models
 
+from ..hooks import MAPPING
+
 
 class AccountMove(models.Model):
     _inherit = "account.move"
 
+    # Above this number of moves, financial_type is computed in SQL
+    _financial_type_sql_threshold = 100
+
     @api.model
     def _selection_financial_type(self):
         return [
@@ -25,6 +30,16 @@ class AccountMove(models.Model):
         readonly=True,
     )
 
+    def write(self, vals):
+        if not {"company_id", "date", "state"}.intersection(vals):
+            return super().write(vals)
+        # The periods of the former dates only change with the dates
+        if {"company_id", "date"}.intersection(vals):
+            self.line_ids._invalidate_tax_balance_cache()
+        res = super().write(vals)
+        self.line_ids._invalidate_tax_balance_cache()
+        return res
+
     @api.depends("line_ids.account_id.account_type", "line_ids.balance")
     def _compute_financial_type(self):
         def _balance_get(line_ids, account_type):
@@ -34,7 +49,11 @@ class AccountMove(models.Model):
                 ).mapped("balance")
             )
 
-        for move in self:
+        moves = self
+        if len(self) > self._financial_type_sql_threshold:
+            moves = self.filtered(lambda move: not move.id)
+            (self - moves)._compute_financial_type_sql()
+        for move in moves:
             account_types = move.line_ids.mapped("account_id.account_type")
             if (
                 "asset_cash" in account_types
@@ -51,3 +70,50 @@ class AccountMove(models.Model):
                 )
             else:
                 move.financial_type = "other"
+
+    @api.model
+    def _get_financial_type_sql_case(self):
+        """CASE expression giving the financial type of a move from its lines,
+        built from the precedence of the mapping of the pre_init_hook. The
+        balances are summed per account type as in the ORM computation.
+        """
+        whens, params = [], []
+        default = "other"
+        for financial_type, account_type, balance_operator in MAPPING:
+            if not account_type:
+                default = financial_type
+                continue
+            when = "bool_or(aa.account_type = %s)"
+            params.append(account_type)
+            if balance_operator:
+                when += (
+                    " AND SUM(aml.balance) FILTER (WHERE aa.account_type = %%s) %s 0"
+                    % balance_operator
+                )
+                params.append(account_type)
+            whens.append("WHEN %s THEN %%s" % when)
+            params.append(financial_type)
+        params.append(default)
+        return "CASE %s ELSE %%s END" % " ".join(whens), params
+
+    def _compute_financial_type_sql(self):
+        """Classify all the moves with a single aggregate query over their
+        lines.
+        """
+        self.env["account.move.line"].flush_model(["move_id", "account_id", "balance"])
+        self.env["account.account"].flush_model(["account_type"])
+        case, params = self._get_financial_type_sql_case()
+        self.env.cr.execute(
+            """
+            SELECT aml.move_id, %s
+            FROM account_move_line aml
+            JOIN account_account aa ON aa.id = aml.account_id
+            WHERE aml.move_id IN %%s
+            GROUP BY aml.move_id
+            """
+            % case,
+            params + [tuple(self.ids)],
+        )
+        financial_types = dict(self.env.cr.fetchall())
+        for move in self:
+            move.financial_type = financial_types.get(move.id, "other")
@@ -1,7 +1,23 @@
 # Copyright 2017 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import models
+from odoo import api, models
+
+# Fields whose change alters the tax balances of the period of a move line
+TAX_BALANCE_CACHE_FIELDS = {
+    "account_id",
+    "balance",
+    "company_id",
+    "credit",
+    "date",
+    "debit",
+    "move_id",
+    "tax_ids",
+    "tax_line_id",
+    "tax_repartition_line_id",
+}
+# Fields whose change moves a line to another period
+TAX_BALANCE_CACHE_DATE_FIELDS = {"company_id", "date", "move_id"}
 
 
 class AccountMoveLine(models.Model):
@@ -23,4 +39,42 @@ class AccountMoveLine(models.Model):
                 ON account_move_line (date, tax_line_id)
             """
             )
+        # Index used to find the taxes with moves in a period
+        self._cr.execute(
+            """
+            SELECT indexname FROM pg_indexes
+            WHERE indexname = 'account_move_line_company_id_date_tax_line_id_idx'
+        """
+        )
+        if not self._cr.fetchone():
+            self._cr.execute(
+                """
+                CREATE INDEX account_move_line_company_id_date_tax_line_id_idx
+                ON account_move_line (company_id, date, tax_line_id)
+                WHERE tax_line_id IS NOT NULL
+            """
+            )
+        return res
+
+    def _invalidate_tax_balance_cache(self):
+        self.env["account.tax.balance.cache"].sudo()._invalidate_move_lines(self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._invalidate_tax_balance_cache()
+        return lines
+
+    def write(self, vals):
+        if TAX_BALANCE_CACHE_FIELDS.isdisjoint(vals):
+            return super().write(vals)
+        # The periods of the former dates only change with the dates
+        if not TAX_BALANCE_CACHE_DATE_FIELDS.isdisjoint(vals):
+            self._invalidate_tax_balance_cache()
+        res = super().write(vals)
+        self._invalidate_tax_balance_cache()
         return res
+
+    def unlink(self):
+        self._invalidate_tax_balance_cache()
+        return super().unlink()
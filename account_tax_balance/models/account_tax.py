@@ -4,6 +4,16 @@
 
 from odoo import _, api, fields, models
 
+# Fields whose change alters the cached tax balances of the company
+TAX_BALANCE_CACHE_TAX_FIELDS = {
+    "children_tax_ids",
+    "company_id",
+    "invoice_repartition_line_ids",
+    "refund_repartition_line_ids",
+    "tax_exigibility",
+    "type_tax_use",
+}
+
 
 class AccountTax(models.Model):
     _inherit = "account.tax"
@@ -36,26 +46,38 @@ class AccountTax(models.Model):
         from_date, to_date, company_ids, _ = self.get_context_values()
         company_ids = tuple(company_ids)
         query = """
-            SELECT id
+            SELECT at.id
             FROM account_tax at
             WHERE
-            company_id in %s AND
-            EXISTS (
-              SELECT 1 FROM account_move_Line aml
-              WHERE
-                date >= %s AND
-                date <= %s AND
-                company_id in %s AND (
-                  tax_line_id = at.id OR
-                  EXISTS (
-                    SELECT 1 FROM account_move_line_account_tax_rel
-                    WHERE account_move_line_id = aml.id AND
-                      account_tax_id = at.id
-                  )
-                )
+            at.company_id in %s AND
+            at.id IN (
+                SELECT aml.tax_line_id
+                FROM account_move_line aml
+                WHERE
+                  aml.company_id in %s AND
+                  aml.date >= %s AND
+                  aml.date <= %s AND
+                  aml.tax_line_id IS NOT NULL
+                UNION
+                SELECT aml_at_rel.account_tax_id
+                FROM account_move_line_account_tax_rel aml_at_rel
+                JOIN account_move_line aml
+                  ON aml.id = aml_at_rel.account_move_line_id
+                WHERE
+                  aml.company_id in %s AND
+                  aml.date >= %s AND
+                  aml.date <= %s
             )
         """
-        params = (company_ids, from_date, to_date, company_ids)
+        params = (
+            company_ids,
+            company_ids,
+            from_date,
+            to_date,
+            company_ids,
+            from_date,
+            to_date,
+        )
         return query, params
 
     def _account_tax_ids_with_moves(self):
@@ -93,22 +115,107 @@ class AccountTax(models.Model):
         "target_move",
     )
     def _compute_balance(self):
+        tax_balances, base_balances = self._get_cached_balances()
+        regular_types = self.get_target_type_list("regular")
+        refund_types = self.get_target_type_list("refund")
         for tax in self:
-            tax.balance_regular = tax.compute_balance(
-                tax_or_base="tax", financial_type="regular"
+            # balance is debit - credit whereas on tax return you want to see
+            # what vat has to be paid so:
+            # VAT on sales (credit) - VAT on purchases (debit).
+            tax_balance = tax_balances.get(tax.id, {})
+            base_balance = base_balances.get(tax.id, {})
+            tax.balance_regular = -sum(tax_balance.get(t, 0.0) for t in regular_types)
+            tax.base_balance_regular = -sum(
+                base_balance.get(t, 0.0) for t in regular_types
             )
-            tax.base_balance_regular = tax.compute_balance(
-                tax_or_base="base", financial_type="regular"
-            )
-            tax.balance_refund = tax.compute_balance(
-                tax_or_base="tax", financial_type="refund"
-            )
-            tax.base_balance_refund = tax.compute_balance(
-                tax_or_base="base", financial_type="refund"
+            tax.balance_refund = -sum(tax_balance.get(t, 0.0) for t in refund_types)
+            tax.base_balance_refund = -sum(
+                base_balance.get(t, 0.0) for t in refund_types
             )
             tax.balance = tax.balance_regular + tax.balance_refund
             tax.base_balance = tax.base_balance_regular + tax.base_balance_refund
 
+    def _invalidate_tax_balance_cache(self):
+        self.env["account.tax.balance.cache"].sudo()._invalidate_companies(
+            self.company_id
+        )
+
+    def write(self, vals):
+        if TAX_BALANCE_CACHE_TAX_FIELDS.isdisjoint(vals):
+            return super().write(vals)
+        self._invalidate_tax_balance_cache()
+        res = super().write(vals)
+        self._invalidate_tax_balance_cache()
+        return res
+
+    def unlink(self):
+        self._invalidate_tax_balance_cache()
+        return super().unlink()
+
+    def _get_cached_balances(self):
+        """Return the tax and base balances by financial type. Balances of
+        closed periods are read from, or stored into, the tax balances cache.
+        """
+        from_date, to_date, company_ids, target_move = self.get_context_values()
+        cache_model = self.env["account.tax.balance.cache"].sudo()
+        companies = self.env["res.company"].browse(company_ids)
+        if not self.ids or not all(
+            cache_model._is_period_closed(company, to_date) for company in companies
+        ):
+            return (
+                self._get_balances_by_financial_type("tax"),
+                self._get_balances_by_financial_type("base"),
+            )
+        balances = {"tax": {}, "base": {}}
+        tax_ids = set(self.ids)
+        for company in companies:
+            cache = cache_model._get_cache(company, from_date, to_date, target_move)
+            for line in cache.line_ids:
+                if line.tax_id.id not in tax_ids:
+                    continue
+                tax_balances = balances[line.tax_or_base].setdefault(line.tax_id.id, {})
+                tax_balances[line.financial_type] = (
+                    tax_balances.get(line.financial_type, 0.0) + line.balance
+                )
+        return balances["tax"], balances["base"]
+
+    def _get_balances_by_financial_type(self, tax_or_base="tax"):
+        """Return the move lines balances of all the taxes of the recordset
+        in a single query, as {tax_id: {financial_type: balance}}.
+
+        The lines of each tax are selected with the domain of the actions
+        opening them (see get_move_lines_domain), so that the balances match
+        the lines the user drills into when these domains are extended.
+        """
+        if not self:
+            return {}
+        move_line_model = self.env["account.move.line"]
+        subqueries = []
+        params = []
+        for tax in self:
+            query = move_line_model._search(
+                tax.get_move_lines_domain(tax_or_base=tax_or_base)
+            )
+            tables, where_clause, where_params = query.get_sql()
+            subqueries.append(
+                """
+                SELECT %s AS tax_id, am.financial_type,
+                    SUM("account_move_line".balance) AS balance
+                FROM {tables}
+                JOIN account_move AS am ON am.id = "account_move_line".move_id
+                WHERE {where_clause}
+                GROUP BY am.financial_type
+                """.format(
+                    tables=tables, where_clause=where_clause
+                )
+            )
+            params += [tax.id] + where_params
+        self.env.cr.execute(" UNION ALL ".join(subqueries), params)
+        balances = {}
+        for tax_id, financial_type, balance in self.env.cr.fetchall():
+            balances.setdefault(tax_id, {})[financial_type] = balance or 0.0
+        return balances
+
     def get_target_type_list(self, financial_type=None):
         if financial_type == "refund":
             return ["receivable_refund", "payable_refund"]
@@ -0,0 +1,159 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from psycopg2 import IntegrityError
+
+from odoo import api, fields, models, tools
+
+
+class AccountTaxBalanceCache(models.Model):
+    """Tax balances of a closed period, stored to serve the tax balance view
+    without reading the move lines again. Entries are dropped as soon as a
+    move or a move line of their period, or a tax of their company, changes."""
+
+    _name = "account.tax.balance.cache"
+    _description = "Tax Balances Cache of a Closed Period"
+
+    company_id = fields.Many2one("res.company", required=True, ondelete="cascade")
+    date_from = fields.Date(required=True)
+    date_to = fields.Date(required=True)
+    target_move = fields.Selection(
+        [("posted", "All Posted Entries"), ("all", "All Entries")], required=True
+    )
+    line_ids = fields.One2many("account.tax.balance.cache.line", "cache_id")
+
+    _sql_constraints = [
+        (
+            "period_uniq",
+            "unique(company_id, date_from, date_to, target_move)",
+            "The balances of a period can only be cached once per company.",
+        )
+    ]
+
+    @api.model
+    def _is_period_closed(self, company, date_to):
+        lock_date = max(
+            company.tax_lock_date or fields.Date.to_date("1900-01-01"),
+            company.fiscalyear_lock_date or fields.Date.to_date("1900-01-01"),
+        )
+        return fields.Date.to_date(date_to) <= lock_date
+
+    @api.model
+    def _get_cache(self, company, date_from, date_to, target_move):
+        """Return the cached balances of all the taxes of the company for the
+        period, computing and storing them if needed."""
+        cache = self.search(
+            [
+                ("company_id", "=", company.id),
+                ("date_from", "=", date_from),
+                ("date_to", "=", date_to),
+                ("target_move", "=", target_move),
+            ],
+            limit=1,
+        )
+        if cache:
+            return cache
+        taxes = (
+            self.env["account.tax"]
+            .with_context(
+                active_test=False,
+                from_date=date_from,
+                to_date=date_to,
+                company_ids=company.ids,
+                target_move=target_move,
+            )
+            .search([("company_id", "=", company.id)])
+        )
+        lines_vals = []
+        for tax_or_base in ("tax", "base"):
+            balances = taxes._get_balances_by_financial_type(tax_or_base)
+            for tax_id, tax_balances in balances.items():
+                for financial_type, balance in tax_balances.items():
+                    if not financial_type:
+                        continue
+                    lines_vals.append(
+                        fields.Command.create(
+                            {
+                                "tax_id": tax_id,
+                                "tax_or_base": tax_or_base,
+                                "financial_type": financial_type,
+                                "balance": balance,
+                            }
+                        )
+                    )
+        vals = {
+            "company_id": company.id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "target_move": target_move,
+            "line_ids": lines_vals,
+        }
+        try:
+            with self.env.cr.savepoint(), tools.mute_logger("odoo.sql_db"):
+                return self.create(vals)
+        except IntegrityError:
+            # Stored meanwhile by a concurrent transaction: serve the
+            # balances just computed without storing them again.
+            return self.new(vals)
+
+    def _get_cached_company_ids(self):
+        self.env.cr.execute("SELECT DISTINCT company_id FROM account_tax_balance_cache")
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _invalidate_caches(self):
+        self.invalidate_model()
+        self.env["account.tax.balance.cache.line"].invalidate_model()
+
+    @api.model
+    def _invalidate_move_lines(self, lines):
+        """Drop the cached periods containing the dates of the given move
+        lines, in a single query run only when their companies have cached
+        periods.
+        """
+        company_ids = self._get_cached_company_ids()
+        lines = lines.browse(lines.ids)
+        if not company_ids or not lines:
+            return
+        lines.flush_recordset(["company_id", "date"])
+        self.env.cr.execute(
+            """
+            DELETE FROM account_tax_balance_cache AS cache
+            USING (
+                SELECT company_id, MIN(date) AS date_min, MAX(date) AS date_max
+                FROM account_move_line
+                WHERE id IN %s AND company_id IN %s
+                GROUP BY company_id
+            ) AS aml
+            WHERE cache.company_id = aml.company_id
+                AND cache.date_from <= aml.date_max
+                AND cache.date_to >= aml.date_min
+            """,
+            (tuple(lines.ids), tuple(company_ids)),
+        )
+        if self.env.cr.rowcount:
+            self._invalidate_caches()
+
+    @api.model
+    def _invalidate_companies(self, companies):
+        """Drop all the cached periods of the given companies."""
+        company_ids = set(companies.ids).intersection(self._get_cached_company_ids())
+        if not company_ids:
+            return
+        self.env.cr.execute(
+            "DELETE FROM account_tax_balance_cache WHERE company_id IN %s",
+            (tuple(company_ids),),
+        )
+        if self.env.cr.rowcount:
+            self._invalidate_caches()
+
+
+class AccountTaxBalanceCacheLine(models.Model):
+    _name = "account.tax.balance.cache.line"
+    _description = "Tax Balances Cache Line"
+
+    cache_id = fields.Many2one(
+        "account.tax.balance.cache", required=True, ondelete="cascade", index=True
+    )
+    tax_id = fields.Many2one("account.tax", required=True, ondelete="cascade")
+    tax_or_base = fields.Selection([("tax", "Tax"), ("base", "Base")], required=True)
+    financial_type = fields.Char(required=True)
+    balance = fields.Float()
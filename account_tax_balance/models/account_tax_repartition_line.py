@@ -0,0 +1,40 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+# Fields whose change alters the cached tax balances of the company
+TAX_BALANCE_CACHE_REPARTITION_FIELDS = {
+    "account_id",
+    "company_id",
+    "factor_percent",
+    "repartition_type",
+    "tag_ids",
+    "use_in_tax_closing",
+}
+
+
+class AccountTaxRepartitionLine(models.Model):
+    _inherit = "account.tax.repartition.line"
+
+    def _invalidate_tax_balance_cache(self):
+        self.env["account.tax.balance.cache"].sudo()._invalidate_companies(
+            self.company_id
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._invalidate_tax_balance_cache()
+        return lines
+
+    def write(self, vals):
+        if TAX_BALANCE_CACHE_REPARTITION_FIELDS.isdisjoint(vals):
+            return super().write(vals)
+        self._invalidate_tax_balance_cache()
+        res = super().write(vals)
+        self._invalidate_tax_balance_cache()
+        return res
+
+    def unlink(self):
+        self._invalidate_tax_balance_cache()
+        return super().unlink()
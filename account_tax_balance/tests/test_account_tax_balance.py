@@ -4,6 +4,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from dateutil.rrule import MONTHLY
 
@@ -283,3 +284,165 @@ class TestInvoicingBalance(AccountTestInvoicingCommon):
             to_date=date,
         )
         self.assertEqual(tax.balance, balance)
+
+    def test_batch_balance(self):
+        """Balances computed for several taxes at once match the per tax
+        computation."""
+        today = fields.Date.today()
+        taxes = self.tax_sale_a | self.tax_sale_b
+        self.init_invoice(
+            "out_invoice",
+            partner=self.partner_a,
+            invoice_date=today,
+            post=True,
+            amounts=[100],
+            taxes=taxes,
+        )
+        self.init_invoice(
+            "out_refund",
+            partner=self.partner_a,
+            invoice_date=today,
+            post=True,
+            amounts=[40],
+            taxes=self.tax_sale_a,
+        )
+        taxes = taxes.with_context(from_date=today, to_date=today)
+        for tax in taxes:
+            for financial_type in ("regular", "refund"):
+                suffix = "_%s" % financial_type
+                self.assertEqual(
+                    tax["balance" + suffix],
+                    tax.compute_balance("tax", financial_type),
+                )
+                self.assertEqual(
+                    tax["base_balance" + suffix],
+                    tax.compute_balance("base", financial_type),
+                )
+        self.assertEqual(taxes[0].base_balance_regular, 100)
+        self.assertEqual(taxes[0].base_balance_refund, -40)
+
+    def test_batch_balance_domain_hooks(self):
+        """Balances follow the domains of the actions opening the lines."""
+        today = fields.Date.today()
+        invoice = self.init_invoice(
+            "out_invoice",
+            partner=self.partner_a,
+            invoice_date=today,
+            post=True,
+            amounts=[100],
+            taxes=self.tax_sale_a,
+        )
+        self.init_invoice(
+            "out_invoice",
+            partner=self.partner_b,
+            invoice_date=today,
+            post=True,
+            amounts=[50],
+            taxes=self.tax_sale_a,
+        )
+        tax_class = type(self.env["account.tax"])
+        get_base_domain = tax_class.get_base_balance_domain
+
+        def get_base_balance_domain(tax, state_list, type_list):
+            domain = get_base_domain(tax, state_list, type_list)
+            return domain + [("partner_id", "=", self.partner_a.id)]
+
+        tax = self.tax_sale_a.with_context(from_date=today, to_date=today)
+        with patch.object(
+            tax_class, "get_base_balance_domain", get_base_balance_domain
+        ):
+            tax.invalidate_recordset()
+            self.assertEqual(tax.base_balance, 100)
+            action = tax.view_base_lines()
+            lines = self.env["account.move.line"].search(action["domain"])
+            self.assertEqual(lines, invoice.invoice_line_ids)
+            self.assertEqual(tax.base_balance, -sum(lines.mapped("balance")))
+
+    def test_financial_type_sql(self):
+        """The batched SQL classification gives the ORM computed values."""
+        today = fields.Date.today()
+        moves = self.env["account.move"]
+        for move_type in ("out_invoice", "out_refund", "in_invoice", "in_refund"):
+            moves |= self.init_invoice(
+                move_type,
+                partner=self.partner_a,
+                invoice_date=today,
+                post=True,
+                amounts=[100],
+            )
+        financial_types = moves.mapped("financial_type")
+        self.assertEqual(
+            financial_types,
+            ["receivable", "receivable_refund", "payable", "payable_refund"],
+        )
+        moves._compute_financial_type_sql()
+        self.assertEqual(moves.mapped("financial_type"), financial_types)
+
+    def test_financial_type_sql_threshold(self):
+        """Above the threshold, the computation dispatches to SQL."""
+        today = fields.Date.today()
+        moves = self.env["account.move"]
+        for move_type in ("out_invoice", "out_refund", "in_invoice", "in_refund"):
+            moves |= self.init_invoice(
+                move_type,
+                partner=self.partner_a,
+                invoice_date=today,
+                post=True,
+                amounts=[100],
+            )
+        financial_types = moves.mapped("financial_type")
+        move_model = type(moves)
+        with patch.object(move_model, "_financial_type_sql_threshold", 1), patch.object(
+            move_model,
+            "_compute_financial_type_sql",
+            side_effect=move_model._compute_financial_type_sql,
+            autospec=True,
+        ) as compute_sql:
+            moves._compute_financial_type()
+        compute_sql.assert_called_once()
+        self.assertEqual(moves.mapped("financial_type"), financial_types)
+
+    def test_closed_period_cache(self):
+        """Balances of closed periods are cached until their moves change."""
+        date = fields.Date.today() - timedelta(days=40)
+        tax = self.tax_sale_a.with_context(
+            from_date=date, to_date=date, target_move="all"
+        )
+        self.init_invoice(
+            "out_invoice",
+            partner=self.partner_a,
+            invoice_date=date,
+            post=True,
+            amounts=[100],
+            taxes=tax,
+        )
+        draft_invoice = self.init_invoice(
+            "out_invoice",
+            partner=self.partner_a,
+            invoice_date=date,
+            amounts=[50],
+            taxes=tax,
+        )
+        self.env.company.tax_lock_date = date
+        cache_model = self.env["account.tax.balance.cache"]
+        self.assertEqual(tax.base_balance, 150)
+        cache = cache_model.search([("company_id", "=", self.env.company.id)])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.date_to, date)
+        tax.invalidate_recordset()
+        self.assertEqual(tax.base_balance, 150)
+        self.assertEqual(
+            cache, cache_model.search([("company_id", "=", self.env.company.id)])
+        )
+        draft_invoice.unlink()
+        self.assertFalse(cache.exists())
+        tax.invalidate_recordset()
+        self.assertEqual(tax.base_balance, 100)
+        self.assertEqual(
+            len(cache_model.search([("company_id", "=", self.env.company.id)])), 1
+        )
+        tag = self.env["account.account.tag"].create(
+            {"name": "Tax balance tag", "applicability": "taxes"}
+        )
+        tax.invoice_repartition_line_ids.write({"tag_ids": [(4, tag.id)]})
+        self.assertFalse(cache_model.search([("company_id", "=", self.env.company.id)]))
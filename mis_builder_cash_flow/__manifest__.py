@@ -13,6 +13,8 @@
         "security/mis_cash_flow_security.xml",
         "report/mis_cash_flow_views.xml",
         "views/mis_cash_flow_forecast_line_views.xml",
+        "views/mis_cash_flow_forecast_recurrence_views.xml",
+        "wizard/mis_cash_flow_forecast_line_import_views.xml",
         "views/account_account_views.xml",
         "data/mis_report_style.xml",
         "data/mis_report.xml",
@@ -1,3 +1,5 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 from . import account_account
+from . import account_move_line
 from . import mis_cash_flow_forecast_line
+from . import mis_cash_flow_forecast_recurrence
@@ -8,3 +8,10 @@ class AccountAccount(models.Model):
     _inherit = "account.account"
 
     hide_in_cash_flow = fields.Boolean(string="Hide in Cash Flow?")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "hide_in_cash_flow" in vals:
+            self.flush_recordset(["hide_in_cash_flow"])
+            self.env["mis.cash_flow"]._refresh_accounts(self.ids)
+        return res
@@ -0,0 +1,59 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from odoo import api, models
+
+# Columns of account_move_line read by the cash flow lines
+CASH_FLOW_FIELDS = {
+    "account_id",
+    "amount_residual",
+    "reconciled",
+    "full_reconcile_id",
+    "partner_id",
+    "company_id",
+    "name",
+    "parent_state",
+    "date_maturity",
+    "date",
+}
+
+
+class AccountMoveLine(models.Model):
+    _inherit = "account.move.line"
+
+    def init(self):
+        # Partial index on the open items read by the cash flow lines
+        self._cr.execute(
+            """
+            SELECT indexname FROM pg_indexes
+            WHERE indexname = 'account_move_line_mis_cash_flow_open_items_idx'
+        """
+        )
+        if not self._cr.fetchone():
+            self._cr.execute(
+                """
+                CREATE INDEX account_move_line_mis_cash_flow_open_items_idx
+                ON account_move_line (
+                    company_id, account_id, (COALESCE(date_maturity, date))
+                )
+                WHERE amount_residual != 0 AND parent_state != 'cancel'
+            """
+            )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["mis.cash_flow"]._refresh_move_lines(lines.ids)
+        return lines
+
+    def _write(self, vals):
+        # Also called when flushing the stored computed fields, as the
+        # residual amount or the state of the move
+        res = super()._write(vals)
+        if CASH_FLOW_FIELDS.intersection(vals):
+            self.env["mis.cash_flow"]._refresh_move_lines(self.ids)
+        return res
+
+    def unlink(self):
+        line_ids = self.ids
+        res = super().unlink()
+        self.env["mis.cash_flow"]._refresh_move_lines(line_ids)
+        return res
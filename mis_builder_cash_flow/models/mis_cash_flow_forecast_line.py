@@ -25,6 +25,19 @@ class MisCashFlowForecastLine(models.Model):
         default=lambda self: self.env.company,
         index=True,
     )
+    recurrence_id = fields.Many2one(
+        comodel_name="mis.cash_flow.forecast_recurrence",
+        string="Recurrence",
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    import_reference = fields.Char(
+        index=True,
+        readonly=True,
+        help="Reference of the import that created the line. Importing again "
+        "with the same reference replaces the line.",
+    )
 
     @api.constrains("company_id", "account_id")
     def _check_company_id_account_id(self):
@@ -32,3 +45,20 @@ class MisCashFlowForecastLine(models.Model):
             raise ValidationError(
                 _("The Company and the Company of the Account must be the same.")
             )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["mis.cash_flow"]._refresh_forecast_lines(lines.ids)
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env["mis.cash_flow"]._refresh_forecast_lines(self.ids)
+        return res
+
+    def unlink(self):
+        line_ids = self.ids
+        res = super().unlink()
+        self.env["mis.cash_flow"]._refresh_forecast_lines(line_ids)
+        return res
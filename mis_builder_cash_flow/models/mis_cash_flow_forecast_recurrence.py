@@ -0,0 +1,93 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+
+class MisCashFlowForecastRecurrence(models.Model):
+    _name = "mis.cash_flow.forecast_recurrence"
+    _description = "MIS Cash Flow Forecast Recurrence"
+
+    name = fields.Char(required=True)
+    account_id = fields.Many2one(
+        comodel_name="account.account",
+        string="Account",
+        required=True,
+        help="The account of the forecast lines is only for informative purpose",
+    )
+    partner_id = fields.Many2one(comodel_name="res.partner", string="Partner")
+    balance = fields.Float(required=True)
+    company_id = fields.Many2one(
+        "res.company",
+        string="Company",
+        required=True,
+        default=lambda self: self.env.company,
+        index=True,
+    )
+    date_start = fields.Date(string="First Date", required=True)
+    interval_number = fields.Integer(string="Repeat Every", default=1, required=True)
+    interval_type = fields.Selection(
+        [("weeks", "Weeks"), ("months", "Months"), ("years", "Years")],
+        default="months",
+        required=True,
+    )
+    count = fields.Integer(string="Number of Lines", default=24, required=True)
+    line_ids = fields.One2many(
+        comodel_name="mis.cash_flow.forecast_line",
+        inverse_name="recurrence_id",
+        string="Forecast Lines",
+    )
+
+    @api.constrains("company_id", "account_id")
+    def _check_company_id_account_id(self):
+        if self.filtered(lambda x: x.company_id != x.account_id.company_id):
+            raise ValidationError(
+                _("The Company and the Company of the Account must be the same.")
+            )
+
+    @api.constrains("interval_number", "count")
+    def _check_interval_number_count(self):
+        if self.filtered(lambda x: x.interval_number < 1 or x.count < 1):
+            raise ValidationError(
+                _("The interval and the number of lines must be positive.")
+            )
+
+    def _get_dates(self):
+        self.ensure_one()
+        return [
+            self.date_start
+            + relativedelta(**{self.interval_type: self.interval_number * i})
+            for i in range(self.count)
+        ]
+
+    def _prepare_forecast_line_vals(self, date):
+        self.ensure_one()
+        return {
+            "recurrence_id": self.id,
+            "date": date,
+            "account_id": self.account_id.id,
+            "partner_id": self.partner_id.id,
+            "name": self.name,
+            "balance": self.balance,
+            "company_id": self.company_id.id,
+        }
+
+    def action_generate(self):
+        """Replace the forecast lines of the recurrences by the ones of their
+        current settings, with one deletion and one creation for all of them."""
+        self.line_ids.unlink()
+        self.env["mis.cash_flow.forecast_line"].create(
+            [
+                recurrence._prepare_forecast_line_vals(date)
+                for recurrence in self
+                for date in recurrence._get_dates()
+            ]
+        )
+        return True
+
+    def unlink(self):
+        # Delete the lines through the ORM rather than in cascade by the
+        # database, so that the stored cash flow lines are refreshed
+        self.line_ids.unlink()
+        return super().unlink()
@@ -2,7 +2,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 from psycopg2.extensions import AsIs
 
-from odoo import fields, models, tools
+from odoo import api, fields, models, tools
 
 
 class MisCashFlow(models.Model):
@@ -55,8 +55,9 @@ class MisCashFlow(models.Model):
             "selection"
         ]
 
-    def init(self):
-        query = """
+    def _get_move_line_query(self, where=""):
+        return (
+            """
             SELECT
                 -- we use negative id to avoid duplicates and we don't use
                 -- ROW_NUMBER() because the performance was very poor
@@ -82,8 +83,19 @@ class MisCashFlow(models.Model):
                 aml.parent_state as state,
                 COALESCE(aml.date_maturity, aml.date) as date
             FROM account_move_line as aml
+            JOIN account_account as aa ON aa.id = aml.account_id
+            -- only the open items weigh on the cash flow
             WHERE aml.parent_state != 'cancel'
-            UNION ALL
+                AND aml.amount_residual != 0
+                AND aa.hide_in_cash_flow IS NOT TRUE
+            %s
+        """
+            % where
+        )
+
+    def _get_forecast_line_query(self, where=""):
+        return (
+            """
             SELECT
                 fl.id as id,
                 'forecast_line' as line_type,
@@ -107,11 +119,156 @@ class MisCashFlow(models.Model):
                 'posted' as state,
                 fl.date as date
             FROM mis_cash_flow_forecast_line as fl
+            JOIN account_account as aa ON aa.id = fl.account_id
+            WHERE aa.hide_in_cash_flow IS NOT TRUE
+            %s
         """
-        tools.drop_view_if_exists(self.env.cr, self._table)
+            % where
+        )
+
+    @api.model
+    def _is_materialized(self):
+        """Whether the cash flow lines must be stored in a table refreshed
+        from the journal items and the forecast lines instead of read from a
+        view. Only read when the module is updated, see _is_stored()."""
+        return tools.str2bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mis_builder_cash_flow.materialized", "False")
+        )
+
+    @api.model
+    def _is_stored(self):
+        """Whether the cash flow lines are currently stored in a table, as
+        built by the last update of the module, and must be refreshed."""
+        return tools.table_kind(self.env.cr, self._table) == "r"
+
+    def init(self):
+        table_kind = tools.table_kind(self.env.cr, self._table)
+        if table_kind == "v":
+            tools.drop_view_if_exists(self.env.cr, self._table)
+        elif table_kind:
+            self._cr.execute("DROP TABLE %s", (AsIs(self._table),))
+        query = "%s UNION ALL %s" % (
+            self._get_move_line_query(),
+            self._get_forecast_line_query(),
+        )
+        if not self._is_materialized():
+            self._cr.execute(
+                "CREATE OR REPLACE VIEW %s AS (%s)", (AsIs(self._table), AsIs(query))
+            )
+            return
+        self._cr.execute("CREATE TABLE %s AS (%s)", (AsIs(self._table), AsIs(query)))
+        self._cr.execute(
+            """
+            CREATE UNIQUE INDEX %(table)s_id_idx ON %(table)s (id);
+            CREATE INDEX %(table)s_company_id_account_id_date_idx
+                ON %(table)s (company_id, account_id, date);
+            ALTER TABLE %(table)s ADD FOREIGN KEY (move_line_id)
+                REFERENCES account_move_line (id) ON DELETE CASCADE;
+            ANALYZE %(table)s;
+            """,
+            {"table": AsIs(self._table)},
+        )
+
+    @api.model
+    def _flush_search(self, domain, fields=None, order=None, seen=None):
+        # Write the pending changes of the journal items and the forecast
+        # lines, from which the stored cash flow lines are refreshed
+        self.env["account.move.line"].flush_model()
+        self.env["mis.cash_flow.forecast_line"].flush_model()
+        self._refresh_pending_lines()
+        return super()._flush_search(domain, fields=fields, order=order, seen=seen)
+
+    @api.model
+    def _get_pending_lines(self):
+        """Return the ids of the journal items and of the forecast lines
+        changed in the transaction, whose stored cash flow lines are not
+        refreshed yet, as {line_type: set of ids}."""
+        precommit = self.env.cr.precommit
+        if "mis.cash_flow.pending_lines" not in precommit.data:
+            precommit.data["mis.cash_flow.pending_lines"] = {
+                "move_line": set(),
+                "forecast_line": set(),
+            }
+            precommit.add(self._refresh_pending_lines)
+        return precommit.data["mis.cash_flow.pending_lines"]
+
+    @api.model
+    def _refresh_move_lines(self, move_line_ids):
+        """Refresh the stored cash flow lines of the given journal items
+        before the next search on the cash flow lines or the commit."""
+        if move_line_ids:
+            self._get_pending_lines()["move_line"].update(move_line_ids)
+
+    @api.model
+    def _refresh_forecast_lines(self, forecast_line_ids):
+        """Refresh the stored cash flow lines of the given forecast lines
+        before the next search on the cash flow lines or the commit."""
+        if forecast_line_ids:
+            self._get_pending_lines()["forecast_line"].update(forecast_line_ids)
+
+    @api.model
+    def _refresh_pending_lines(self):
+        pending = self.env.cr.precommit.data.get("mis.cash_flow.pending_lines")
+        if not pending or not any(pending.values()):
+            return
+        move_line_ids = list(pending["move_line"])
+        forecast_line_ids = list(pending["forecast_line"])
+        pending["move_line"].clear()
+        pending["forecast_line"].clear()
+        if not self._is_stored():
+            return
+        if move_line_ids:
+            self._update_move_lines(move_line_ids)
+        if forecast_line_ids:
+            self._update_forecast_lines(forecast_line_ids)
+        self.invalidate_model()
+
+    @api.model
+    def _update_move_lines(self, move_line_ids):
+        """Update the stored cash flow lines of the given journal items"""
+        self._cr.execute(
+            "DELETE FROM %s WHERE id IN %s",
+            (AsIs(self._table), tuple(-line_id for line_id in move_line_ids)),
+        )
+        query = self._get_move_line_query("AND aml.id IN %s")
+        self._cr.execute(
+            "INSERT INTO %s (%s)" % (self._table, query), (tuple(move_line_ids),)
+        )
+
+    @api.model
+    def _update_forecast_lines(self, forecast_line_ids):
+        """Update the stored cash flow lines of the given forecast lines"""
+        self._cr.execute(
+            "DELETE FROM %s WHERE line_type = 'forecast_line' AND id IN %s",
+            (AsIs(self._table), tuple(forecast_line_ids)),
+        )
+        query = self._get_forecast_line_query("AND fl.id IN %s")
+        self._cr.execute(
+            "INSERT INTO %s (%s)" % (self._table, query), (tuple(forecast_line_ids),)
+        )
+
+    @api.model
+    def _refresh_accounts(self, account_ids):
+        """Update the stored cash flow lines of the given accounts"""
+        if not account_ids or not self._is_stored():
+            return
+        self.env["account.move.line"].flush_model()
+        self.env["mis.cash_flow.forecast_line"].flush_model()
+        self._cr.execute(
+            "DELETE FROM %s WHERE account_id IN %s",
+            (AsIs(self._table), tuple(account_ids)),
+        )
+        query = "%s UNION ALL %s" % (
+            self._get_move_line_query("AND aml.account_id IN %(account_ids)s"),
+            self._get_forecast_line_query("AND fl.account_id IN %(account_ids)s"),
+        )
         self._cr.execute(
-            "CREATE OR REPLACE VIEW %s AS (%s)", (AsIs(self._table), AsIs(query))
+            "INSERT INTO %s (%s)" % (self._table, query),
+            {"account_ids": tuple(account_ids)},
         )
+        self.invalidate_model()
 
     def action_open_related_line(self):
         self.ensure_one()
@@ -1,9 +1,11 @@
 # Copyright 2019 Creu Blanca
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import base64
 from datetime import timedelta
 
-from odoo.exceptions import ValidationError
+from odoo import tools
+from odoo.exceptions import UserError, ValidationError
 from odoo.fields import Date
 from odoo.tests.common import TransactionCase, tagged
 from odoo.tools import mute_logger
@@ -148,3 +150,255 @@ class TestCashFlow(TransactionCase):
                         break
                 if not found:
                     self.assertEqual(cell.val, 0)
+
+    def test_materialized_parameter_before_update(self):
+        # The parameter only applies once the module is updated
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mis_builder_cash_flow.materialized", "True"
+        )
+        cash_flow = self.env["mis.cash_flow"]
+        self.assertEqual(tools.table_kind(self.env.cr, cash_flow._table), "v")
+        self.assertFalse(cash_flow._is_stored())
+        line = self.env["mis.cash_flow.forecast_line"].create(
+            {
+                "account_id": self.account.id,
+                "date": Date.today(),
+                "balance": 1000,
+                "company_id": self.company.id,
+            }
+        )
+        lines = cash_flow.search(
+            [("line_type", "=", "forecast_line"), ("id", "=", line.id)]
+        )
+        self.assertEqual(lines.debit, 1000)
+
+    def test_materialized_table(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mis_builder_cash_flow.materialized", "True"
+        )
+        cash_flow = self.env["mis.cash_flow"]
+        cash_flow.init()
+        self.assertEqual(tools.table_kind(self.env.cr, cash_flow._table), "r")
+        move = self.env["account.move"].create(
+            {
+                "name": "Move",
+                "journal_id": self.journal.id,
+                "company_id": self.company.id,
+                "move_type": "entry",
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "account_id": self.bank_account.id,
+                            "debit": 1500,
+                            "credit": 0,
+                            "company_id": self.company.id,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "account_id": self.account.id,
+                            "debit": 0,
+                            "credit": 1500,
+                            "company_id": self.company.id,
+                        },
+                    ),
+                ],
+            }
+        )
+        move._post()
+        lines = cash_flow.search([("move_line_id", "in", move.line_ids.ids)])
+        self.assertEqual(lines.move_line_id, move.line_ids)
+        self.assertEqual(sum(lines.mapped("debit")), 1500)
+        self.assertEqual(sum(lines.mapped("credit")), 1500)
+        self.check_matrix(
+            args=[
+                ("liquidity", "Current", 1500),
+                ("balance", "Current", 1500),
+                ("in_receivable", "Current", -1500),
+            ],
+            ignore_rows=["balance", "period_balance", "in_total"],
+        )
+        forecast_line = self.env["mis.cash_flow.forecast_line"].create(
+            {
+                "account_id": self.account.id,
+                "date": Date.today(),
+                "balance": 1000,
+                "company_id": self.company.id,
+            }
+        )
+        domain = [("line_type", "=", "forecast_line"), ("id", "=", forecast_line.id)]
+        self.assertEqual(cash_flow.search(domain).debit, 1000)
+        forecast_line.balance = -200
+        self.assertEqual(cash_flow.search(domain).credit, 200)
+        forecast_line.unlink()
+        self.assertFalse(cash_flow.search(domain))
+        move.button_draft()
+        move.button_cancel()
+        self.assertFalse(cash_flow.search([("move_line_id", "in", move.line_ids.ids)]))
+
+    def test_open_items(self):
+        expense_account = self.env["account.account"].create(
+            {
+                "company_id": self.company.id,
+                "code": "TEST4",
+                "name": "Expense",
+                "account_type": "expense",
+            }
+        )
+        move = self.env["account.move"].create(
+            {
+                "name": "Move",
+                "journal_id": self.journal.id,
+                "company_id": self.company.id,
+                "move_type": "entry",
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "account_id": self.bank_account.id,
+                            "debit": 0,
+                            "credit": 700,
+                            "company_id": self.company.id,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "account_id": self.bank_account_hide.id,
+                            "debit": 0,
+                            "credit": 300,
+                            "company_id": self.company.id,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "account_id": expense_account.id,
+                            "debit": 1000,
+                            "credit": 0,
+                            "company_id": self.company.id,
+                        },
+                    ),
+                ],
+            }
+        )
+        move._post()
+        for materialized in ("False", "True"):
+            self.env["ir.config_parameter"].sudo().set_param(
+                "mis_builder_cash_flow.materialized", materialized
+            )
+            cash_flow = self.env["mis.cash_flow"]
+            cash_flow.init()
+            domain = [("move_line_id", "in", move.line_ids.ids)]
+            # No residual on the expense and the hidden account is left out
+            self.assertEqual(cash_flow.search(domain).account_id, self.bank_account)
+            self.bank_account_hide.hide_in_cash_flow = False
+            self.assertEqual(
+                cash_flow.search(domain).account_id,
+                self.bank_account | self.bank_account_hide,
+            )
+            self.bank_account_hide.hide_in_cash_flow = True
+            self.assertEqual(cash_flow.search(domain).account_id, self.bank_account)
+
+    def test_recurrence(self):
+        recurrence = self.env["mis.cash_flow.forecast_recurrence"].create(
+            {
+                "name": "Rent",
+                "account_id": self.account.id,
+                "company_id": self.company.id,
+                "balance": -800,
+                "date_start": Date.to_date("2024-01-31"),
+                "count": 24,
+            }
+        )
+        recurrence.action_generate()
+        lines = recurrence.line_ids
+        self.assertEqual(len(lines), 24)
+        self.assertEqual(min(lines.mapped("date")), Date.to_date("2024-01-31"))
+        self.assertIn(Date.to_date("2024-02-29"), lines.mapped("date"))
+        self.assertEqual(max(lines.mapped("date")), Date.to_date("2025-12-31"))
+        self.assertEqual(set(lines.mapped("balance")), {-800})
+        # Generating again replaces the lines
+        recurrence.write({"count": 12, "interval_type": "weeks"})
+        recurrence.action_generate()
+        self.assertFalse(lines.exists())
+        self.assertEqual(len(recurrence.line_ids), 12)
+        self.assertEqual(
+            max(recurrence.line_ids.mapped("date")), Date.to_date("2024-04-17")
+        )
+
+    def test_recurrence_unlink_materialized(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mis_builder_cash_flow.materialized", "True"
+        )
+        cash_flow = self.env["mis.cash_flow"]
+        cash_flow.init()
+        recurrence = self.env["mis.cash_flow.forecast_recurrence"].create(
+            {
+                "name": "Rent",
+                "account_id": self.account.id,
+                "company_id": self.company.id,
+                "balance": -800,
+                "date_start": Date.to_date("2024-01-31"),
+                "count": 3,
+            }
+        )
+        recurrence.action_generate()
+        domain = [
+            ("line_type", "=", "forecast_line"),
+            ("id", "in", recurrence.line_ids.ids),
+        ]
+        self.assertEqual(len(cash_flow.search(domain)), 3)
+        recurrence.unlink()
+        self.assertFalse(cash_flow.search(domain))
+
+    def test_import_forecast_lines(self):
+        partner = self.env["res.partner"].create({"name": "Landlord", "ref": "LL"})
+        content = (
+            "date,account,partner,name,balance\n"
+            "2024-01-31,TEST3,LL,Rent,-800\n"
+            "2024-02-29,TEST3,Landlord,Rent,-800\n"
+            "2024-03-31,TEST3,,Sale,1200.5\n"
+        )
+        wizard = self.env["mis.cash_flow.forecast_line.import"].create(
+            {
+                "data_file": base64.b64encode(content.encode()),
+                "filename": "budget.csv",
+                "reference": "budget",
+                "company_id": self.company.id,
+            }
+        )
+        wizard.action_import()
+        lines = self.env["mis.cash_flow.forecast_line"].search(
+            [("import_reference", "=", "budget")]
+        )
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines.account_id, self.account)
+        self.assertEqual(lines.partner_id, partner)
+        self.assertEqual(sum(lines.mapped("balance")), -399.5)
+        # Importing again with the same reference replaces the lines
+        wizard.action_import()
+        self.assertFalse(lines.exists())
+        self.assertEqual(
+            self.env["mis.cash_flow.forecast_line"].search_count(
+                [("import_reference", "=", "budget")]
+            ),
+            3,
+        )
+        # All the wrong rows are reported at once
+        wizard.data_file = base64.b64encode(
+            (
+                "date,account,partner,name,balance\n"
+                "2024-01-31,UNKNOWN,,Rent,-800\n"
+                "not a date,TEST3,,Rent,-800\n"
+            ).encode()
+        )
+        with self.assertRaisesRegex(UserError, "Row 2.*\n.*Row 3"):
+            wizard.action_import()
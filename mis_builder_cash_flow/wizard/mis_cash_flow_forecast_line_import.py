@@ -0,0 +1,176 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import base64
+import csv
+import io
+import logging
+from datetime import date, datetime
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    _logger.debug("Cannot import openpyxl, XLSX files can not be imported.")
+    openpyxl = None
+
+COLUMNS = ("date", "account", "partner", "name", "balance")
+
+
+class MisCashFlowForecastLineImport(models.TransientModel):
+    """Create forecast lines from a CSV or XLSX file with the columns date,
+    account (code), partner (reference or name), name and balance."""
+
+    _name = "mis.cash_flow.forecast_line.import"
+    _description = "Import MIS Cash Flow Forecast Lines"
+
+    data_file = fields.Binary(string="File", required=True)
+    filename = fields.Char()
+    reference = fields.Char(
+        required=True,
+        help="The forecast lines of a previous import with the same reference "
+        "are replaced by the ones of the file.",
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        string="Company",
+        required=True,
+        default=lambda self: self.env.company,
+    )
+    delimiter = fields.Char(default=",", required=True, size=1)
+
+    @api.onchange("filename")
+    def _onchange_filename(self):
+        if self.filename and not self.reference:
+            self.reference = self.filename
+
+    def _read_csv(self, content):
+        reader = csv.reader(
+            io.StringIO(content.decode("utf-8-sig")), delimiter=self.delimiter
+        )
+        return list(reader)
+
+    def _read_xlsx(self, content):
+        if openpyxl is None:
+            raise UserError(_("The openpyxl library is required to import XLSX files."))
+        workbook = openpyxl.load_workbook(
+            io.BytesIO(content), read_only=True, data_only=True
+        )
+        return [list(row) for row in workbook.active.iter_rows(values_only=True)]
+
+    def _read_rows(self):
+        """Return the rows of the file as dictionaries by column name"""
+        content = base64.b64decode(self.data_file)
+        if (self.filename or "").lower().endswith(".xlsx"):
+            rows = self._read_xlsx(content)
+        else:
+            rows = self._read_csv(content)
+        if not rows:
+            raise UserError(_("The file is empty."))
+        header = [str(column or "").strip().lower() for column in rows[0]]
+        missing = set(COLUMNS) - {"partner"} - set(header)
+        if missing:
+            raise UserError(
+                _("Missing columns in the file: %s") % ", ".join(sorted(missing))
+            )
+        return [
+            dict(zip(header, row))
+            for row in rows[1:]
+            if any(value not in (None, "") for value in row)
+        ]
+
+    def _get_accounts_by_code(self, codes):
+        accounts = self.env["account.account"].search(
+            [("company_id", "=", self.company_id.id), ("code", "in", list(codes))]
+        )
+        return {account.code: account.id for account in accounts}
+
+    def _get_partners_by_key(self, keys):
+        partners = self.env["res.partner"].search(
+            ["|", ("ref", "in", list(keys)), ("name", "in", list(keys))]
+        )
+        by_key = {}
+        # The references take precedence over the names
+        for field_name in ("name", "ref"):
+            for partner in partners.sorted("id", reverse=True):
+                if partner[field_name] in keys:
+                    by_key[partner[field_name]] = partner.id
+        return by_key
+
+    @api.model
+    def _parse_date(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return fields.Date.to_date(str(value).strip())
+
+    def _prepare_forecast_lines_vals(self, rows):
+        """Check all the rows at once and return the values of the forecast
+        lines, or raise an error listing all the wrong rows."""
+        accounts = self._get_accounts_by_code(
+            {str(row.get("account") or "").strip() for row in rows}
+        )
+        partners = self._get_partners_by_key(
+            {str(row["partner"]).strip() for row in rows if row.get("partner")}
+        )
+        errors = []
+        vals_list = []
+        # The first row of the file is the header
+        for number, row in enumerate(rows, start=2):
+            account_code = str(row.get("account") or "").strip()
+            partner_key = str(row.get("partner") or "").strip()
+            if account_code not in accounts:
+                errors.append(
+                    _("Row %(row)s: unknown account %(account)s")
+                    % {"row": number, "account": account_code}
+                )
+                continue
+            if partner_key and partner_key not in partners:
+                errors.append(
+                    _("Row %(row)s: unknown partner %(partner)s")
+                    % {"row": number, "partner": partner_key}
+                )
+                continue
+            try:
+                line_date = self._parse_date(row.get("date"))
+                balance = float(row.get("balance"))
+            except (TypeError, ValueError):
+                errors.append(_("Row %s: wrong date or balance") % number)
+                continue
+            vals_list.append(
+                {
+                    "date": line_date,
+                    "account_id": accounts[account_code],
+                    "partner_id": partners.get(partner_key, False),
+                    "name": str(row.get("name") or "").strip() or "/",
+                    "balance": balance,
+                    "company_id": self.company_id.id,
+                    "import_reference": self.reference,
+                }
+            )
+        if errors:
+            raise UserError("\n".join(errors))
+        return vals_list
+
+    def action_import(self):
+        self.ensure_one()
+        vals_list = self._prepare_forecast_lines_vals(self._read_rows())
+        forecast_line_model = self.env["mis.cash_flow.forecast_line"]
+        forecast_line_model.search(
+            [
+                ("import_reference", "=", self.reference),
+                ("company_id", "=", self.company_id.id),
+            ]
+        ).unlink()
+        forecast_line_model.create(vals_list)
+        action = self.env["ir.actions.act_window"]._for_xml_id(
+            "mis_builder_cash_flow.action_mis_cash_flow_forecast_line"
+        )
+        action["domain"] = [
+            ("import_reference", "=", self.reference),
+            ("company_id", "=", self.company_id.id),
+        ]
+        return action
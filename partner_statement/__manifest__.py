@@ -14,6 +14,7 @@
     "data": [
         "security/ir.model.access.csv",
         "security/statement_security.xml",
+        "data/ir_cron.xml",
         "views/activity_statement.xml",
         "views/outstanding_statement.xml",
         "views/detailed_activity_statement.xml",
@@ -0,0 +1,133 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import json
+import logging
+import threading
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+
+class PartnerStatementAttachmentJob(models.Model):
+    """Statements to save as PDF attachments of the partners, generated by
+    chunks in a scheduled action rather than in the request of the wizard."""
+
+    _name = "partner.statement.attachment.job"
+    _description = "Partner Statements Attachments Job"
+    _order = "id"
+
+    name = fields.Char(required=True, help="Name of the attachments.")
+    report_id = fields.Many2one(
+        comodel_name="ir.actions.report", required=True, ondelete="cascade"
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company", required=True, ondelete="cascade"
+    )
+    partner_ids = fields.Many2many(comodel_name="res.partner")
+    data = fields.Text(
+        required=True,
+        help="Options of the statement, in JSON. They identify the attachments "
+        "of the statement, so that an interrupted job resumes where it stopped.",
+    )
+    chunk_size = fields.Integer(default=100)
+    state = fields.Selection(
+        [("pending", "Pending"), ("done", "Done")], default="pending", required=True
+    )
+
+    @api.model
+    def _cron_generate_attachments(self):
+        for job in self.search([("state", "=", "pending")]):
+            job.with_user(job.create_uid).with_company(
+                job.company_id
+            )._generate_attachments()
+
+    def _get_attachments_domain(self):
+        self.ensure_one()
+        return [
+            ("res_model", "=", "res.partner"),
+            ("res_id", "in", self.partner_ids.ids),
+            ("name", "=", self.name),
+            ("description", "=", self.data),
+        ]
+
+    def _render_statements(self, doc_ids, data, values):
+        """Render the statements of the partners in a single run, from the
+        values already computed for them, and return the PDF of each one."""
+        self.ensure_one()
+        report_action = self.env["ir.actions.report"]
+        data = dict(data, report_values=values)
+        # In tests without enough workers for wkhtmltopdf, as for the reports
+        if (
+            tools.config["test_enable"] or tools.config["test_file"]
+        ) and not self.env.context.get("force_report_rendering"):
+            content = report_action._render_qweb_html(self.report_id, doc_ids, data)[0]
+            return dict.fromkeys(doc_ids, content)
+        streams = report_action._render_qweb_pdf_prepare_streams(
+            self.report_id, data, res_ids=doc_ids
+        )
+        contents = {}
+        for partner_id, stream_data in streams.items():
+            if partner_id and stream_data["stream"]:
+                contents[partner_id] = stream_data["stream"].getvalue()
+            if stream_data["stream"]:
+                stream_data["stream"].close()
+        # The PDF could not be split by partner: render them one by one
+        data.pop("report_values")
+        for partner_id in doc_ids:
+            if partner_id not in contents:
+                contents[partner_id] = report_action._render_qweb_pdf(
+                    self.report_id,
+                    [partner_id],
+                    data=dict(data, partner_ids=[partner_id]),
+                )[0]
+        return contents
+
+    def _generate_attachments(self):
+        """Save the PDF statement of each partner as an attachment of the
+        partner. The partners are processed by chunks, whose statements are
+        computed and rendered together, and the attachments of each chunk
+        are committed. The partners that already have the attachment of the
+        statement are skipped, so a new run resumes an interrupted job.
+        """
+        self.ensure_one()
+        attachment_model = self.env["ir.attachment"]
+        attachments = attachment_model.search(self._get_attachments_domain())
+        done_ids = set(attachments.mapped("res_id"))
+        partner_ids = [p for p in self.partner_ids.ids if p not in done_ids]
+        data = json.loads(self.data)
+        filter_partners = len(self.partner_ids) > 1
+        chunk_size = max(self.chunk_size, 1)
+        statement_model = self.env["report.%s" % self.report_id.report_name]
+        for index in range(0, len(partner_ids), chunk_size):
+            chunk_ids = partner_ids[index : index + chunk_size]
+            chunk_data = dict(
+                data, partner_ids=chunk_ids, filter_partners=filter_partners
+            )
+            values = statement_model._get_report_values(chunk_ids, chunk_data)
+            contents = self._render_statements(values["doc_ids"], chunk_data, values)
+            attachments |= attachment_model.create(
+                [
+                    {
+                        "name": self.name,
+                        "description": self.data,
+                        "type": "binary",
+                        "raw": content,
+                        "res_model": "res.partner",
+                        "res_id": partner_id,
+                        "mimetype": "application/pdf",
+                    }
+                    for partner_id, content in contents.items()
+                ]
+            )
+            if not getattr(threading.current_thread(), "testing", False):
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.env.invalidate_all()
+            _logger.info(
+                "%s: %s/%s partners done",
+                self.name,
+                min(index + chunk_size, len(partner_ids)),
+                len(partner_ids),
+            )
+        self.state = "done"
+        return attachments
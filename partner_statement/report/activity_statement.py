@@ -28,25 +28,13 @@ class ActivityStatement(models.AbstractModel):
                     THEN l.amount_currency - sum(coalesce(pd.debit_amount_currency, 0.0))
                     ELSE l.amount_currency + sum(coalesce(pc.credit_amount_currency, 0.0))
                 END AS open_amount_currency
-            FROM account_move_line l
-            JOIN account_account aa ON (aa.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date < %(date_start)s
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date < %(date_start)s
-            ) as pc ON pc.credit_move_id = l.id
+            FROM partner_statement_line l
+            LEFT JOIN partner_statement_partial pd ON (
+                pd.debit_move_id = l.id AND pd.credit_date < %(date_start)s)
+            LEFT JOIN partner_statement_partial pc ON (
+                pc.credit_move_id = l.id AND pc.debit_date < %(date_start)s)
             WHERE l.partner_id IN %(partners)s
                 AND l.date < %(date_start)s AND not l.blocked
-                AND m.state IN ('posted')
-                AND aa.account_type = %(account_type)s
                 AND (
                     (pd.id IS NOT NULL AND
                         pd.max_date < %(date_start)s) OR
@@ -121,18 +109,18 @@ class ActivityStatement(models.AbstractModel):
         return str(
             self._cr.mogrify(
                 """
-            SELECT m.name AS move_id, l.partner_id, l.date,
+            SELECT l.move_name AS move_id, l.partner_id, l.date,
                 array_agg(l.id ORDER BY l.id) as ids,
-                CASE WHEN (aj.type IN ('sale', 'purchase'))
+                CASE WHEN (l.journal_type IN ('sale', 'purchase'))
                     THEN l.name
                     ELSE '/'
                 END as name,
                 CASE
-                    WHEN (aj.type IN ('sale', 'purchase')) AND l.name IS NOT NULL
+                    WHEN (l.journal_type IN ('sale', 'purchase')) AND l.name IS NOT NULL
                         THEN l.ref
-                    WHEN (aj.type in ('bank', 'cash'))
+                    WHEN (l.journal_type in ('bank', 'cash'))
                         THEN %(payment_ref)s
-                    ELSE m.ref
+                    ELSE l.move_ref
                 END as case_ref,
                 l.blocked, l.currency_id, l.company_id,
                 sum(CASE WHEN (l.currency_id is not null AND l.amount_currency > 0.0)
@@ -147,17 +135,12 @@ class ActivityStatement(models.AbstractModel):
                     THEN l.date
                     ELSE l.date_maturity
                 END as date_maturity
-            FROM account_move_line l
-            JOIN account_account aa ON (aa.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            JOIN account_journal aj ON (l.journal_id = aj.id)
+            FROM partner_statement_line l
             WHERE l.partner_id IN %(partners)s
                 AND %(date_start)s <= l.date
                 AND l.date <= %(date_end)s
-                AND m.state IN ('posted')
-                AND aa.account_type = %(account_type)s
-            GROUP BY l.partner_id, m.name, l.date, l.date_maturity,
-                CASE WHEN (aj.type IN ('sale', 'purchase'))
+            GROUP BY l.partner_id, l.move_name, l.date, l.date_maturity,
+                CASE WHEN (l.journal_type IN ('sale', 'purchase'))
                     THEN l.name
                     ELSE '/'
                 END, case_ref, l.blocked, l.currency_id, l.company_id
@@ -254,9 +237,9 @@ class ActivityStatement(models.AbstractModel):
                 ELSE l.date_maturity
             END as date_maturity
             FROM {sub}
-            LEFT JOIN account_partial_reconcile pd ON (
+            LEFT JOIN partner_statement_partial pd ON (
                 pd.debit_move_id = {sub}.id AND pd.max_date <= %(date_end)s)
-            LEFT JOIN account_partial_reconcile pc ON (
+            LEFT JOIN partner_statement_partial pc ON (
                 pc.credit_move_id = {sub}.id AND pc.max_date <= %(date_end)s)
             LEFT JOIN account_move_line l ON (
                 pd.credit_move_id = l.id OR pc.debit_move_id = l.id)
@@ -6,17 +6,7 @@ from odoo import _, models
 
 from odoo.addons.report_xlsx_helper.report.report_xlsx_format import FORMATS
 
-
-def copy_format(book, fmt):
-    properties = [f[4:] for f in dir(fmt) if f[0:4] == "set_"]
-    dft_fmt = book.add_format()
-    return book.add_format(
-        {
-            k: v
-            for k, v in fmt.__dict__.items()
-            if k in properties and dft_fmt.__dict__[k] != v
-        }
-    )
+from .statement_xlsx_format import StatementFormatPool
 
 
 class ActivityStatementXslx(models.AbstractModel):
@@ -36,6 +26,7 @@ class ActivityStatementXslx(models.AbstractModel):
     def _write_currency_lines(self, row_pos, sheet, partner, currency, data):
         partner_data = data.get("data", {}).get(partner.id, {})
         currency_data = partner_data.get("currencies", {}).get(currency.id)
+        format_pool = data["format_pool"]
         account_type = data.get("account_type", False)
         row_pos += 2
         statement_header = _(
@@ -83,18 +74,15 @@ class ActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("balance_forward"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
-        format_tcell_left = FORMATS["format_tcell_left"]
-        format_tcell_date_left = FORMATS["format_tcell_date_left"]
-        format_distributed = FORMATS["format_distributed"]
-        current_money_format = FORMATS["current_money_format"]
         for line in currency_data.get("lines"):
-            if line.get("blocked"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_blocked"]
-                format_distributed = FORMATS["format_distributed_blocked"]
-                current_money_format = FORMATS["current_money_format_blocked"]
+            (
+                format_tcell_left,
+                format_tcell_date_left,
+                format_distributed,
+                current_money_format,
+            ) = format_pool.get_line_formats(currency, blocked=line.get("blocked"))
             row_pos += 1
             name_to_show = (
                 line.get("name", "") == "/" or not line.get("name", "")
@@ -128,7 +116,7 @@ class ActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("amount_due"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
         return row_pos
 
@@ -136,6 +124,7 @@ class ActivityStatementXslx(models.AbstractModel):
         report_model = self.env["report.partner_statement.activity_statement"]
         partner_data = data.get("data", {}).get(partner.id, {})
         currency_data = partner_data.get("currencies", {}).get(currency.id)
+        format_pool = data["format_pool"]
         if currency_data.get("buckets"):
             row_pos += 2
             buckets_header = _("Aging Report at %(end)s in %(currency)s") % {
@@ -162,43 +151,43 @@ class ActivityStatementXslx(models.AbstractModel):
                 row_pos,
                 0,
                 buckets_data.get("current", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 1,
                 buckets_data.get("b_1_30", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 2,
                 buckets_data.get("b_30_60", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 3,
                 buckets_data.get("b_60_90", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 4,
                 buckets_data.get("b_90_120", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 5,
                 buckets_data.get("b_over_120", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
             sheet.write(
                 row_pos,
                 6,
                 buckets_data.get("balance", 0.0),
-                FORMATS["current_money_format"],
+                format_pool.get("current_money_format", currency),
             )
         return row_pos
 
@@ -211,13 +200,13 @@ class ActivityStatementXslx(models.AbstractModel):
         self = self.with_context(lang=lang)
         report_model = self.env["report.partner_statement.activity_statement"]
         self._define_formats(workbook)
-        FORMATS["format_distributed"] = workbook.add_format({"align": "vdistributed"})
         company_id = data.get("company_id", False)
         if company_id:
             company = self.env["res.company"].browse(company_id)
         else:
             company = self.env.user.company_id
         data.update(report_model._get_report_values(data.get("partner_ids"), data))
+        data["format_pool"] = StatementFormatPool(workbook)
         partners = self.env["res.partner"].browse(data.get("partner_ids"))
         sheet = workbook.add_worksheet(_("Activity Statement"))
         sheet.set_landscape()
@@ -299,34 +288,6 @@ class ActivityStatementXslx(models.AbstractModel):
                 row_pos += 1
             for currency_id in currencies:
                 currency = self.env["res.currency"].browse(currency_id)
-                if currency.position == "after":
-                    money_string = "#,##0.%s " % (
-                        "0" * currency.decimal_places
-                    ) + "[${}]".format(currency.symbol)
-                elif currency.position == "before":
-                    money_string = "[${}]".format(currency.symbol) + " #,##0.%s" % (
-                        "0" * currency.decimal_places
-                    )
-                FORMATS["current_money_format"] = workbook.add_format(
-                    {"align": "right", "num_format": money_string}
-                )
-                bg_grey = "#ADB5BD"
-                FORMATS["format_tcell_left_blocked"] = copy_format(
-                    workbook, FORMATS["format_tcell_left"]
-                )
-                FORMATS["format_tcell_left_blocked"].set_bg_color(bg_grey)
-                FORMATS["format_tcell_date_left_blocked"] = copy_format(
-                    workbook, FORMATS["format_tcell_date_left"]
-                )
-                FORMATS["format_tcell_date_left_blocked"].set_bg_color(bg_grey)
-                FORMATS["format_distributed_blocked"] = copy_format(
-                    workbook, FORMATS["format_distributed"]
-                )
-                FORMATS["format_distributed_blocked"].set_bg_color(bg_grey)
-                FORMATS["current_money_format_blocked"] = copy_format(
-                    workbook, FORMATS["current_money_format"]
-                )
-                FORMATS["current_money_format_blocked"].set_bg_color(bg_grey)
                 row_pos = self._write_currency_lines(
                     row_pos, sheet, partner, currency, data
                 )
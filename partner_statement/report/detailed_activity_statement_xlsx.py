@@ -6,17 +6,7 @@ from odoo import _, models
 
 from odoo.addons.report_xlsx_helper.report.report_xlsx_format import FORMATS
 
-
-def copy_format(book, fmt):
-    properties = [f[4:] for f in dir(fmt) if f[0:4] == "set_"]
-    dft_fmt = book.add_format()
-    return book.add_format(
-        {
-            k: v
-            for k, v in fmt.__dict__.items()
-            if k in properties and dft_fmt.__dict__[k] != v
-        }
-    )
+from .statement_xlsx_format import StatementFormatPool
 
 
 class DetailedActivityStatementXslx(models.AbstractModel):
@@ -36,6 +26,7 @@ class DetailedActivityStatementXslx(models.AbstractModel):
     def _write_currency_lines(self, row_pos, sheet, partner, currency, data):
         partner_data = data.get("data", {}).get(partner.id, {})
         currency_data = partner_data.get("currencies", {}).get(currency.id)
+        format_pool = data["format_pool"]
         account_type = data.get("account_type", False)
         row_pos += 2
         statement_header = _(
@@ -92,75 +83,21 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("balance_forward"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
         for line in currency_data.get("lines"):
-            if line.get("blocked") and not line.get("reconciled_line"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_blocked"]
-                format_distributed = FORMATS["format_distributed_blocked"]
-                current_money_format = FORMATS["current_money_format_blocked"]
-            elif (
-                line.get("reconciled_line")
-                and not line.get("blocked")
-                and not line.get("outside-date-rank")
-            ):
-                format_tcell_left = FORMATS["format_tcell_left_reconciled"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_reconciled"]
-                format_distributed = FORMATS["format_distributed_reconciled"]
-                current_money_format = FORMATS["current_money_format_reconciled"]
-            elif (
-                line.get("blocked")
-                and line.get("reconciled_line")
-                and not line.get("outside-date-rank")
-            ):
-                format_tcell_left = FORMATS["format_tcell_left_blocked_reconciled"]
-                format_tcell_date_left = FORMATS[
-                    "format_tcell_date_left_blocked_reconciled"
-                ]
-                format_distributed = FORMATS["format_distributed_blocked_reconciled"]
-                current_money_format = FORMATS[
-                    "current_money_format_blocked_reconciled"
-                ]
-            elif (
-                line.get("reconciled_line")
-                and not line.get("blocked")
-                and line.get("outside-date-rank")
-            ):
-                format_tcell_left = FORMATS[
-                    "format_tcell_left_reconciled_outside-date-rank"
-                ]
-                format_tcell_date_left = FORMATS[
-                    "format_tcell_date_left_reconciled_outside-date-rank"
-                ]
-                format_distributed = FORMATS[
-                    "format_distributed_reconciled_outside-date-rank"
-                ]
-                current_money_format = FORMATS[
-                    "current_money_format_reconciled_outside-date-rank"
-                ]
-            elif (
-                line.get("blocked")
-                and line.get("reconciled_line")
-                and line.get("outside-date-rank")
-            ):
-                format_tcell_left = FORMATS[
-                    "format_tcell_left_blocked_reconciled_outside-date-rank"
-                ]
-                format_tcell_date_left = FORMATS[
-                    "format_tcell_date_left_blocked_reconciled_outside-date-rank"
-                ]
-                format_distributed = FORMATS[
-                    "format_distributed_blocked_reconciled_outside-date-rank"
-                ]
-                current_money_format = FORMATS[
-                    "current_money_format_blocked_reconciled_outside-date-rank"
-                ]
-            else:
-                format_tcell_left = FORMATS["format_tcell_left"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left"]
-                format_distributed = FORMATS["format_distributed"]
-                current_money_format = FORMATS["current_money_format"]
+            (
+                format_tcell_left,
+                format_tcell_date_left,
+                format_distributed,
+                current_money_format,
+            ) = format_pool.get_line_formats(
+                currency,
+                blocked=line.get("blocked"),
+                reconciled=line.get("reconciled_line"),
+                outside_date_rank=line.get("reconciled_line")
+                and line.get("outside-date-rank"),
+            )
             row_pos += 1
             name_to_show = (
                 line.get("name", "") == "/" or not line.get("name", "")
@@ -209,13 +146,14 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("amount_due"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
         return row_pos
 
     def _write_currency_prior_lines(self, row_pos, sheet, partner, currency, data):
         partner_data = data.get("data", {}).get(partner.id, {})
         currency_data = partner_data.get("currencies", {}).get(currency.id)
+        format_pool = data["format_pool"]
         account_type = data.get("account_type", False)
         row_pos += 2
         statement_header = _(
@@ -250,30 +188,17 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos, 5, _("Open Amount"), FORMATS["format_theader_yellow_center"]
         )
         sheet.write(row_pos, 6, _("Balance"), FORMATS["format_theader_yellow_center"])
-        format_tcell_left = FORMATS["format_tcell_left"]
-        format_tcell_date_left = FORMATS["format_tcell_date_left"]
-        format_distributed = FORMATS["format_distributed"]
-        current_money_format = FORMATS["current_money_format"]
         for line in currency_data.get("prior_lines"):
-            if line.get("blocked") and not line.get("reconciled_line"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_blocked"]
-                format_distributed = FORMATS["format_distributed_blocked"]
-                current_money_format = FORMATS["current_money_format_blocked"]
-            elif line.get("reconciled_line") and not line.get("blocked"):
-                format_tcell_left = FORMATS["format_tcell_left_reconciled"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_reconciled"]
-                format_distributed = FORMATS["format_distributed_reconciled"]
-                current_money_format = FORMATS["current_money_format_reconciled"]
-            elif line.get("blocked") and line.get("reconciled_line"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked_reconciled"]
-                format_tcell_date_left = FORMATS[
-                    "format_tcell_date_left_blocked_reconciled"
-                ]
-                format_distributed = FORMATS["format_distributed_blocked_reconciled"]
-                current_money_format = FORMATS[
-                    "current_money_format_blocked_reconciled"
-                ]
+            (
+                format_tcell_left,
+                format_tcell_date_left,
+                format_distributed,
+                current_money_format,
+            ) = format_pool.get_line_formats(
+                currency,
+                blocked=line.get("blocked"),
+                reconciled=line.get("reconciled_line"),
+            )
             row_pos += 1
             name_to_show = (
                 line.get("name", "") == "/" or not line.get("name", "")
@@ -316,13 +241,14 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("balance_forward"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
         return row_pos
 
     def _write_currency_ending_lines(self, row_pos, sheet, partner, currency, data):
         partner_data = data.get("data", {}).get(partner.id, {})
         currency_data = partner_data.get("currencies", {}).get(currency.id)
+        format_pool = data["format_pool"]
         account_type = data.get("account_type", False)
         row_pos += 2
         statement_header = _("%(payable)sStatement up to %(end)s in %(currency)s") % {
@@ -355,30 +281,17 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos, 5, _("Open Amount"), FORMATS["format_theader_yellow_center"]
         )
         sheet.write(row_pos, 6, _("Balance"), FORMATS["format_theader_yellow_center"])
-        format_tcell_left = FORMATS["format_tcell_left"]
-        format_tcell_date_left = FORMATS["format_tcell_date_left"]
-        format_distributed = FORMATS["format_distributed"]
-        current_money_format = FORMATS["current_money_format"]
         for line in currency_data.get("ending_lines"):
-            if line.get("blocked") and not line.get("reconciled_line"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_blocked"]
-                format_distributed = FORMATS["format_distributed_blocked"]
-                current_money_format = FORMATS["current_money_format_blocked"]
-            elif line.get("reconciled_line") and not line.get("blocked"):
-                format_tcell_left = FORMATS["format_tcell_left_reconciled"]
-                format_tcell_date_left = FORMATS["format_tcell_date_left_reconciled"]
-                format_distributed = FORMATS["format_distributed_reconciled"]
-                current_money_format = FORMATS["current_money_format_reconciled"]
-            elif line.get("blocked") and line.get("reconciled_line"):
-                format_tcell_left = FORMATS["format_tcell_left_blocked_reconciled"]
-                format_tcell_date_left = FORMATS[
-                    "format_tcell_date_left_blocked_reconciled"
-                ]
-                format_distributed = FORMATS["format_distributed_blocked_reconciled"]
-                current_money_format = FORMATS[
-                    "current_money_format_blocked_reconciled"
-                ]
+            (
+                format_tcell_left,
+                format_tcell_date_left,
+                format_distributed,
+                current_money_format,
+            ) = format_pool.get_line_formats(
+                currency,
+                blocked=line.get("blocked"),
+                reconciled=line.get("reconciled_line"),
+            )
             row_pos += 1
             name_to_show = (
                 line.get("name", "") == "/" or not line.get("name", "")
@@ -421,7 +334,7 @@ class DetailedActivityStatementXslx(models.AbstractModel):
             row_pos,
             6,
             currency_data.get("amount_due"),
-            FORMATS["current_money_format"],
+            format_pool.get("current_money_format", currency),
         )
         return row_pos
 
@@ -434,13 +347,13 @@ class DetailedActivityStatementXslx(models.AbstractModel):
         self = self.with_context(lang=lang)
         report_model = self.env["report.partner_statement.detailed_activity_statement"]
         self._define_formats(workbook)
-        FORMATS["format_distributed"] = workbook.add_format({"align": "vdistributed"})
         company_id = data.get("company_id", False)
         if company_id:
             company = self.env["res.company"].browse(company_id)
         else:
             company = self.env.user.company_id
         data.update(report_model._get_report_values(data.get("partner_ids"), data))
+        data["format_pool"] = StatementFormatPool(workbook)
         partners = self.env["res.partner"].browse(data.get("partner_ids"))
         sheet = workbook.add_worksheet(_("Detailed Activity Statement"))
         sheet.set_landscape()
@@ -522,130 +435,6 @@ class DetailedActivityStatementXslx(models.AbstractModel):
                 row_pos += 1
             for currency_id in currencies:
                 currency = self.env["res.currency"].browse(currency_id)
-                if currency.position == "after":
-                    money_string = "#,##0.%s " % (
-                        "0" * currency.decimal_places
-                    ) + "[${}]".format(currency.symbol)
-                elif currency.position == "before":
-                    money_string = "[${}]".format(currency.symbol) + " #,##0.%s" % (
-                        "0" * currency.decimal_places
-                    )
-                FORMATS["current_money_format"] = workbook.add_format(
-                    {"align": "right", "num_format": money_string}
-                )
-                bg_grey = "#ADB5BD"
-                fc_red = "#DC3545"
-                FORMATS["format_tcell_left_blocked"] = copy_format(
-                    workbook, FORMATS["format_tcell_left"]
-                )
-                FORMATS["format_tcell_left_blocked"].set_bg_color(bg_grey)
-                FORMATS["format_tcell_date_left_blocked"] = copy_format(
-                    workbook, FORMATS["format_tcell_date_left"]
-                )
-                FORMATS["format_tcell_date_left_blocked"].set_bg_color(bg_grey)
-                FORMATS["format_distributed_blocked"] = copy_format(
-                    workbook, FORMATS["format_distributed"]
-                )
-                FORMATS["format_distributed_blocked"].set_bg_color(bg_grey)
-                FORMATS["current_money_format_blocked"] = copy_format(
-                    workbook, FORMATS["current_money_format"]
-                )
-                FORMATS["current_money_format_blocked"].set_bg_color(bg_grey)
-                FORMATS["format_tcell_left_reconciled"] = copy_format(
-                    workbook, FORMATS["format_tcell_left"]
-                )
-                FORMATS["format_tcell_left_reconciled"].set_italic(True)
-                FORMATS["format_tcell_left_reconciled"].set_font_size(10)
-                FORMATS["format_tcell_left_reconciled"].set_indent(1)
-                FORMATS["format_tcell_date_left_reconciled"] = copy_format(
-                    workbook, FORMATS["format_tcell_date_left"]
-                )
-                FORMATS["format_tcell_date_left_reconciled"].set_italic(True)
-                FORMATS["format_tcell_date_left_reconciled"].set_font_size(10)
-                FORMATS["format_distributed_reconciled"] = copy_format(
-                    workbook, FORMATS["format_distributed"]
-                )
-                FORMATS["format_distributed_reconciled"].set_italic(True)
-                FORMATS["format_distributed_reconciled"].set_font_size(10)
-                FORMATS["current_money_format_reconciled"] = copy_format(
-                    workbook, FORMATS["current_money_format"]
-                )
-                FORMATS["current_money_format_reconciled"].set_italic(True)
-                FORMATS["current_money_format_reconciled"].set_font_size(10)
-                FORMATS["format_tcell_left_blocked_reconciled"] = copy_format(
-                    workbook, FORMATS["format_tcell_left_reconciled"]
-                )
-                FORMATS["format_tcell_left_blocked_reconciled"].set_bg_color(bg_grey)
-                FORMATS["format_tcell_date_left_blocked_reconciled"] = copy_format(
-                    workbook, FORMATS["format_tcell_date_left_reconciled"]
-                )
-                FORMATS["format_tcell_date_left_blocked_reconciled"].set_bg_color(
-                    bg_grey
-                )
-                FORMATS["format_distributed_blocked_reconciled"] = copy_format(
-                    workbook, FORMATS["format_distributed_reconciled"]
-                )
-                FORMATS["format_distributed_blocked_reconciled"].set_bg_color(bg_grey)
-                FORMATS["current_money_format_blocked_reconciled"] = copy_format(
-                    workbook, FORMATS["current_money_format_reconciled"]
-                )
-                FORMATS["current_money_format_blocked_reconciled"].set_bg_color(bg_grey)
-                FORMATS["format_tcell_left_reconciled_outside-date-rank"] = copy_format(
-                    workbook, FORMATS["format_tcell_left_reconciled"]
-                )
-                FORMATS[
-                    "format_tcell_left_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "format_tcell_date_left_reconciled_outside-date-rank"
-                ] = copy_format(workbook, FORMATS["format_tcell_date_left_reconciled"])
-                FORMATS[
-                    "format_tcell_date_left_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "format_distributed_reconciled_outside-date-rank"
-                ] = copy_format(workbook, FORMATS["format_distributed_reconciled"])
-                FORMATS[
-                    "format_distributed_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "current_money_format_reconciled_outside-date-rank"
-                ] = copy_format(workbook, FORMATS["current_money_format_reconciled"])
-                FORMATS[
-                    "current_money_format_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "format_tcell_left_blocked_reconciled_outside-date-rank"
-                ] = copy_format(
-                    workbook, FORMATS["format_tcell_left_blocked_reconciled"]
-                )
-                FORMATS[
-                    "format_tcell_left_blocked_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "format_tcell_date_left_blocked_reconciled_outside-date-rank"
-                ] = copy_format(
-                    workbook, FORMATS["format_tcell_date_left_blocked_reconciled"]
-                )
-                FORMATS[
-                    "format_tcell_date_left_blocked_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "format_distributed_blocked_reconciled_outside-date-rank"
-                ] = copy_format(
-                    workbook, FORMATS["format_distributed_blocked_reconciled"]
-                )
-                FORMATS[
-                    "format_distributed_blocked_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
-                FORMATS[
-                    "current_money_format_blocked_reconciled_outside-date-rank"
-                ] = copy_format(
-                    workbook, FORMATS["current_money_format_blocked_reconciled"]
-                )
-                FORMATS[
-                    "current_money_format_blocked_reconciled_outside-date-rank"
-                ].set_font_color(fc_red)
                 row_pos = self._write_currency_prior_lines(
                     row_pos, sheet, partner, currency, data
                 )
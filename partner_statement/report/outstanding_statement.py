@@ -17,11 +17,11 @@ class OutstandingStatement(models.AbstractModel):
         return str(
             self._cr.mogrify(
                 """
-            SELECT l.id, m.name AS move_id, l.partner_id, l.date, l.name,
+            SELECT l.id, l.move_name AS move_id, l.partner_id, l.date, l.name,
                 l.blocked, l.currency_id, l.company_id,
             CASE WHEN l.ref IS NOT NULL
                 THEN l.ref
-                ELSE m.ref
+                ELSE l.move_ref
             END as ref,
             CASE WHEN (l.currency_id is not null AND l.amount_currency > 0.0)
                 THEN avg(l.amount_currency)
@@ -43,21 +43,11 @@ class OutstandingStatement(models.AbstractModel):
                 THEN l.date
                 ELSE l.date_maturity
             END as date_maturity
-            FROM account_move_line l
-            JOIN account_account aa ON (aa.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date <= %(date_end)s
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date <= %(date_end)s
-            ) as pc ON pc.credit_move_id = l.id
+            FROM partner_statement_line l
+            LEFT JOIN partner_statement_partial pd ON (
+                pd.debit_move_id = l.id AND pd.credit_date <= %(date_end)s)
+            LEFT JOIN partner_statement_partial pc ON (
+                pc.credit_move_id = l.id AND pc.debit_date <= %(date_end)s)
             WHERE l.partner_id IN %(partners)s
                 AND (
                     (pd.id IS NOT NULL AND
@@ -65,12 +55,11 @@ class OutstandingStatement(models.AbstractModel):
                     (pc.id IS NOT NULL AND
                         pc.max_date <= %(date_end)s) OR
                     (pd.id IS NULL AND pc.id IS NULL)
-                ) AND l.date <= %(date_end)s AND m.state IN ('posted')
-                AND aa.account_type = %(account_type)s
-            GROUP BY l.id, l.partner_id, m.name, l.date, l.date_maturity, l.name,
+                ) AND l.date <= %(date_end)s
+            GROUP BY l.id, l.partner_id, l.move_name, l.date, l.date_maturity, l.name,
                 CASE WHEN l.ref IS NOT NULL
                     THEN l.ref
-                    ELSE m.ref
+                    ELSE l.move_ref
                 END,
                 l.blocked, l.currency_id, l.balance, l.amount_currency, l.company_id
             """,
@@ -1,7 +1,9 @@
 # Copyright 2018 ForgeFlow, S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
+from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from odoo import _, api, fields, models
 from odoo.tools.misc import DEFAULT_SERVER_DATE_FORMAT
@@ -24,6 +26,63 @@ class ReportStatementCommon(models.AbstractModel):
             date = datetime.strptime(date, DEFAULT_SERVER_DATE_FORMAT)
         return date.strftime(date_format) if date else ""
 
+    def _create_statement_tables(self, company_id, partner_ids, date_end, account_type):
+        """Materialise once per statement run the move lines of the partners
+        that can appear in the statement, and their partial reconciliations,
+        in temporary tables. All the sections of the statement are queried
+        from these tables instead of scanning the move lines and the partial
+        reconciliations again for each of them.
+
+        partner_statement_line holds the posted move lines of the company
+        on the accounts of the statement type up to the end date.
+        partner_statement_partial holds the partial reconciliations of these
+        lines with the date of both reconciled lines.
+        """
+        self.env["account.move.line"].flush_model()
+        self.env["account.move"].flush_model()
+        self.env["account.partial.reconcile"].flush_model()
+        self._cr.execute(
+            """
+            DROP TABLE IF EXISTS partner_statement_line;
+            DROP TABLE IF EXISTS partner_statement_partial;
+            CREATE TEMPORARY TABLE partner_statement_line ON COMMIT DROP AS
+            SELECT l.id, l.partner_id, l.company_id, l.move_id,
+                m.name AS move_name, m.ref AS move_ref, aj.type AS journal_type,
+                l.date, l.date_maturity, l.name, l.ref, l.blocked, l.currency_id,
+                l.balance, l.amount_currency, l.debit, l.credit
+            FROM account_move_line l
+            JOIN account_account aa ON (aa.id = l.account_id)
+            JOIN account_move m ON (l.move_id = m.id)
+            JOIN account_journal aj ON (l.journal_id = aj.id)
+            WHERE l.partner_id IN %(partners)s
+                AND l.company_id = %(company_id)s
+                AND l.date <= %(date_end)s
+                AND m.state IN ('posted')
+                AND aa.account_type = %(account_type)s;
+            CREATE INDEX ON partner_statement_line (partner_id, date);
+            CREATE INDEX ON partner_statement_line (id);
+            CREATE TEMPORARY TABLE partner_statement_partial ON COMMIT DROP AS
+            SELECT pr.id, pr.debit_move_id, pr.credit_move_id, pr.amount,
+                pr.debit_amount_currency, pr.credit_amount_currency, pr.max_date,
+                ld.date AS debit_date, lc.date AS credit_date
+            FROM account_partial_reconcile pr
+            JOIN account_move_line ld ON (ld.id = pr.debit_move_id)
+            JOIN account_move_line lc ON (lc.id = pr.credit_move_id)
+            WHERE pr.debit_move_id IN (SELECT id FROM partner_statement_line)
+                OR pr.credit_move_id IN (SELECT id FROM partner_statement_line);
+            CREATE INDEX ON partner_statement_partial (debit_move_id);
+            CREATE INDEX ON partner_statement_partial (credit_move_id);
+            ANALYZE partner_statement_line;
+            ANALYZE partner_statement_partial;
+            """,
+            {
+                "partners": tuple(partner_ids),
+                "company_id": company_id,
+                "date_end": date_end,
+                "account_type": account_type,
+            },
+        )
+
     def _get_account_display_lines(
         self, company_id, partner_ids, date_start, date_end, account_type
     ):
@@ -49,6 +108,15 @@ class ReportStatementCommon(models.AbstractModel):
     ):
         return {}
 
+    def _get_reconciled_lines_index(self, reconciled_lines):
+        """Index the reconciled lines by the id of the statement line they
+        are reconciled with, keeping their position to preserve the order
+        of the query when a statement line groups several move lines."""
+        index = defaultdict(list)
+        for position, line in enumerate(reconciled_lines):
+            index[line["id"]].append((position, line))
+        return index
+
     def _show_buckets_sql_q1(self, partners, date_end, account_type):
         return str(
             self._cr.mogrify(
@@ -66,21 +134,11 @@ class ReportStatementCommon(models.AbstractModel):
                 THEN l.date
                 ELSE l.date_maturity
             END as date_maturity
-            FROM account_move_line l
-            JOIN account_move m ON (l.move_id = m.id)
-            JOIN account_account aa ON (aa.id = l.account_id)
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date <= %(date_end)s
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date <= %(date_end)s
-            ) as pc ON pc.credit_move_id = l.id
+            FROM partner_statement_line l
+            LEFT JOIN partner_statement_partial pd ON (
+                pd.debit_move_id = l.id AND pd.credit_date <= %(date_end)s)
+            LEFT JOIN partner_statement_partial pc ON (
+                pc.credit_move_id = l.id AND pc.debit_date <= %(date_end)s)
             WHERE l.partner_id IN %(partners)s
                                 AND (
                                   (pd.id IS NOT NULL AND
@@ -89,8 +147,6 @@ class ReportStatementCommon(models.AbstractModel):
                                       pc.max_date <= %(date_end)s) OR
                                   (pd.id IS NULL AND pc.id IS NULL)
                                 ) AND l.date <= %(date_end)s AND not l.blocked
-                                  AND m.state IN ('posted')
-                                AND aa.account_type = %(account_type)s
             GROUP BY l.partner_id, l.currency_id, l.date, l.date_maturity,
                                 l.amount_currency, l.balance, l.move_id,
                                 l.company_id, l.id
@@ -339,6 +395,9 @@ class ReportStatementCommon(models.AbstractModel):
           }
         }
         """
+        if data and data.get("report_values"):
+            # already computed, e.g. to save the statements as attachments
+            return data["report_values"]
         company_id = data["company_id"]
         partner_ids = data["partner_ids"]
         date_start = data.get("date_start")
@@ -372,6 +431,7 @@ class ReportStatementCommon(models.AbstractModel):
 
         res = {}
         # get base data
+        self._create_statement_tables(company_id, partner_ids, date_end, account_type)
         prior_day = date_start - timedelta(days=1) if date_start else None
         prior_lines = (
             self._get_account_display_prior_lines(
@@ -390,12 +450,12 @@ class ReportStatementCommon(models.AbstractModel):
             if is_detailed
             else {}
         )
-        reconciled_lines = (
+        reconciled_lines = self._get_reconciled_lines_index(
             self._get_account_display_reconciled_lines(
                 company_id, partner_ids, date_start, date_end, account_type
             )
             if is_activity
-            else {}
+            else []
         )
         balances_forward = self._get_account_initial_balance(
             company_id, partner_ids, date_start, account_type
@@ -410,18 +470,16 @@ class ReportStatementCommon(models.AbstractModel):
             bucket_labels = {}
 
         # organize and format for report
-        format_date = self._format_date_to_partner_lang
+        # many lines share the same dates, format each date only once per format
+        format_date = lru_cache(maxsize=None)(self._format_date_to_partner_lang)
         partners_to_remove = set()
         for partner_id in partner_ids:
+            date_format = date_formats.get(partner_id, default_fmt)
             res[partner_id] = {
-                "today": format_date(today, date_formats.get(partner_id, default_fmt)),
-                "start": format_date(
-                    date_start, date_formats.get(partner_id, default_fmt)
-                ),
-                "end": format_date(date_end, date_formats.get(partner_id, default_fmt)),
-                "prior_day": format_date(
-                    prior_day, date_formats.get(partner_id, default_fmt)
-                ),
+                "today": format_date(today, date_format),
+                "start": format_date(date_start, date_format),
+                "end": format_date(date_end, date_format),
+                "prior_day": format_date(prior_day, date_format),
                 "currencies": {},
             }
             currency_dict = res[partner_id]["currencies"]
@@ -449,12 +507,8 @@ class ReportStatementCommon(models.AbstractModel):
                 if not line["blocked"]:
                     line_currency["amount_due"] += line["open_amount"]
                 line["balance"] = line_currency["amount_due"]
-                line["date"] = format_date(
-                    line["date"], date_formats.get(partner_id, default_fmt)
-                )
-                line["date_maturity"] = format_date(
-                    line["date_maturity"], date_formats.get(partner_id, default_fmt)
-                )
+                line["date"] = format_date(line["date"], date_format)
+                line["date_maturity"] = format_date(line["date_maturity"], date_format)
                 line_currency["prior_lines"].extend(
                     self._add_currency_prior_line(line, currencies[line["currency_id"]])
                 )
@@ -477,12 +531,8 @@ class ReportStatementCommon(models.AbstractModel):
                         line_currency["ending_balance"] += line[amount_field]
                     line["balance"] = line_currency["ending_balance"]
                 line["outside-date-rank"] = False
-                line["date"] = format_date(
-                    line["date"], date_formats.get(partner_id, default_fmt)
-                )
-                line["date_maturity"] = format_date(
-                    line["date_maturity"], date_formats.get(partner_id, default_fmt)
-                )
+                line["date"] = format_date(line["date"], date_format)
+                line["date_maturity"] = format_date(line["date_maturity"], date_format)
                 line["reconciled_line"] = False
                 if is_activity:
                     line["open_amount"] = 0.0
@@ -490,29 +540,33 @@ class ReportStatementCommon(models.AbstractModel):
                 line_currency["lines"].extend(
                     self._add_currency_line(line, currencies[line["currency_id"]])
                 )
-                for line2 in reconciled_lines:
-                    if line2["id"] in line["ids"]:
-                        line2["reconciled_line"] = True
-                        line2["applied_amount"] = line2["open_amount"]
-                        if line2["date"] >= date_start and line2["date"] <= date_end:
-                            line2["outside-date-rank"] = False
-                            if not line2["blocked"]:
-                                line["applied_amount"] += line2["open_amount"]
-                        else:
-                            line2["outside-date-rank"] = True
-                        line2["date"] = format_date(
-                            line2["date"], date_formats.get(partner_id, default_fmt)
-                        )
-                        line2["date_maturity"] = format_date(
-                            line2["date_maturity"],
-                            date_formats.get(partner_id, default_fmt),
-                        )
-                        if is_detailed:
-                            line_currency["lines"].extend(
-                                self._add_currency_line(
-                                    line2, currencies[line["currency_id"]]
-                                )
+                line_reconciled_lines = [
+                    line2
+                    for __, line2 in sorted(
+                        item
+                        for line_id in line.get("ids") or []
+                        for item in reconciled_lines.get(line_id, [])
+                    )
+                ]
+                for line2 in line_reconciled_lines:
+                    line2["reconciled_line"] = True
+                    line2["applied_amount"] = line2["open_amount"]
+                    if line2["date"] >= date_start and line2["date"] <= date_end:
+                        line2["outside-date-rank"] = False
+                        if not line2["blocked"]:
+                            line["applied_amount"] += line2["open_amount"]
+                    else:
+                        line2["outside-date-rank"] = True
+                    line2["date"] = format_date(line2["date"], date_format)
+                    line2["date_maturity"] = format_date(
+                        line2["date_maturity"], date_format
+                    )
+                    if is_detailed:
+                        line_currency["lines"].extend(
+                            self._add_currency_line(
+                                line2, currencies[line["currency_id"]]
                             )
+                        )
                 if is_activity:
                     line["open_amount"] = line["amount"] + line["applied_amount"]
                     if not line["blocked"]:
@@ -527,12 +581,8 @@ class ReportStatementCommon(models.AbstractModel):
                 if not line["blocked"]:
                     line_currency["amount_due"] += line["open_amount"]
                 line["balance"] = line_currency["amount_due"]
-                line["date"] = format_date(
-                    line["date"], date_formats.get(partner_id, default_fmt)
-                )
-                line["date_maturity"] = format_date(
-                    line["date_maturity"], date_formats.get(partner_id, default_fmt)
-                )
+                line["date"] = format_date(line["date"], date_format)
+                line["date_maturity"] = format_date(line["date_maturity"], date_format)
                 line_currency["ending_lines"].extend(
                     self._add_currency_ending_line(
                         line, currencies[line["currency_id"]]
@@ -551,7 +601,9 @@ class ReportStatementCommon(models.AbstractModel):
                     line_currency = currency_dict[line["currency_id"]]
                     line_currency["buckets"] = line
 
-            if len(partner_ids) > 1:
+            # the filters are only relevant when several partners are printed,
+            # unless the caller forces them, e.g. on a chunk of a batch
+            if data.get("filter_partners", len(partner_ids) > 1):
                 values = currency_dict.values()
                 if not any([v["lines"] or v["balance_forward"] for v in values]):
                     if data["filter_non_due_partners"]:
@@ -0,0 +1,93 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+
+from xlsxwriter.format import Format
+
+from odoo.addons.report_xlsx_helper.report.report_xlsx_format import FORMATS
+
+BG_GREY = "#ADB5BD"
+FC_RED = "#DC3545"
+
+
+def get_money_string(currency):
+    decimals = "0" * currency.decimal_places
+    if currency.position == "after":
+        return "#,##0.{} [${}]".format(decimals, currency.symbol)
+    return "[${}] #,##0.{}".format(currency.symbol, decimals)
+
+
+class StatementFormatPool:
+    """Formats of the statement lines of a workbook.
+
+    Each distinct style, given by the currency format and whether the line
+    is blocked, reconciled or out of the statement dates, is added to the
+    workbook only once, however many partners and currencies are exported.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._base_properties = {}
+        self._formats = {}
+
+    def _get_base_properties(self, name):
+        """Properties of a format defined by report_xlsx_helper"""
+        if name not in self._base_properties:
+            fmt = FORMATS[name]
+            properties = [f[4:] for f in dir(fmt) if f[0:4] == "set_"]
+            dft_fmt = Format()
+            self._base_properties[name] = {
+                k: v
+                for k, v in fmt.__dict__.items()
+                if k in properties and dft_fmt.__dict__[k] != v
+            }
+        return self._base_properties[name]
+
+    def get(
+        self,
+        name,
+        currency=None,
+        blocked=False,
+        reconciled=False,
+        outside_date_rank=False,
+    ):
+        money_string = (
+            get_money_string(currency) if name == "current_money_format" else None
+        )
+        key = (
+            name,
+            money_string,
+            bool(blocked),
+            bool(reconciled),
+            bool(outside_date_rank),
+        )
+        if key not in self._formats:
+            if name == "current_money_format":
+                properties = {"align": "right", "num_format": money_string}
+            elif name == "format_distributed":
+                properties = {"align": "vdistributed"}
+            else:
+                properties = dict(self._get_base_properties(name))
+            if reconciled:
+                properties.update(italic=True, font_size=10)
+                if name == "format_tcell_left":
+                    properties["indent"] = 1
+            if blocked:
+                properties["bg_color"] = BG_GREY
+            if outside_date_rank:
+                properties["font_color"] = FC_RED
+            self._formats[key] = self.workbook.add_format(properties)
+        return self._formats[key]
+
+    def get_line_formats(
+        self, currency, blocked=False, reconciled=False, outside_date_rank=False
+    ):
+        """Return the formats of the reference, date, description and
+        amount cells of a statement line."""
+        return tuple(
+            self.get(name, currency, blocked, reconciled, outside_date_rank)
+            for name in (
+                "format_tcell_left",
+                "format_tcell_date_left",
+                "format_distributed",
+                "current_money_format",
+            )
+        )
@@ -1,14 +1,19 @@
 # Copyright 2018 ForgeFlow, S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
-from datetime import date
+from datetime import date, timedelta
+from io import BytesIO
+from unittest.mock import patch
 
+import xlsxwriter
 from freezegun import freeze_time
 
 from odoo import fields
 from odoo.tests import new_test_user
 from odoo.tests.common import TransactionCase
 
+from ..report.statement_xlsx_format import StatementFormatPool
+
 
 class TestActivityStatement(TransactionCase):
     """Tests for Activity Statement."""
@@ -43,6 +48,67 @@ class TestActivityStatement(TransactionCase):
         cls.report_title = "Activity Statement"
         cls.today = fields.Date.context_today(cls.wiz)
 
+    def _get_synthetic_report_values(self, partner_ids, reconciled_line_class=dict):
+        """Return the statement values of 5 invoice lines per partner, each
+        one reconciled with a payment line of 40."""
+        currency_id = self.company.currency_id.id
+        date_start = date(2024, 1, 1)
+        lines = {partner_id: [] for partner_id in partner_ids}
+        reconciled_lines = []
+        line_id = 0
+        for partner_id in partner_ids:
+            for i in range(5):
+                line_id += 1
+                line_date = date_start + timedelta(days=i)
+                line = {
+                    "move_id": "INV/%s" % line_id,
+                    "date": line_date,
+                    "date_maturity": line_date,
+                    "ids": [line_id],
+                    "name": "",
+                    "ref": "",
+                    "debit": 100.0,
+                    "credit": 0.0,
+                    "amount": 100.0,
+                    "blocked": False,
+                    "currency_id": currency_id,
+                }
+                lines[partner_id].append(line)
+                reconciled_lines.append(
+                    reconciled_line_class(
+                        line,
+                        move_id="PAY/%s" % line_id,
+                        debit=0.0,
+                        credit=40.0,
+                        amount=-40.0,
+                        open_amount=-40.0,
+                        id=line_id,
+                    )
+                )
+        data = {
+            "company_id": self.company.id,
+            "partner_ids": list(partner_ids),
+            "date_start": date_start,
+            "date_end": date(2024, 1, 31),
+            "account_type": "asset_receivable",
+            "aging_type": "days",
+            "is_activity": True,
+            "show_aging_buckets": False,
+            "filter_non_due_partners": False,
+            "filter_negative_balances": False,
+        }
+        statement_class = type(self.statement_model)
+        with patch.object(
+            statement_class, "_get_account_display_lines", return_value=lines
+        ), patch.object(
+            statement_class,
+            "_get_account_display_reconciled_lines",
+            return_value=reconciled_lines,
+        ), patch.object(
+            statement_class, "_get_account_initial_balance", return_value={}
+        ):
+            return self.statement_model._get_report_values(partner_ids, data)
+
     def test_customer_activity_statement(self):
 
         wiz_id = self.wiz.with_context(
@@ -102,6 +168,122 @@ class TestActivityStatement(TransactionCase):
             "bucket_labels", report, "There was an error while compiling the report."
         )
 
+    def test_reconciled_lines_index(self):
+        reconciled_lines = [
+            {"id": 2, "move_id": "PAY/1"},
+            {"id": 1, "move_id": "PAY/2"},
+            {"id": 2, "move_id": "PAY/3"},
+        ]
+        index = self.statement_model._get_reconciled_lines_index(reconciled_lines)
+        self.assertEqual(set(index), {1, 2})
+        self.assertEqual(index[1], [(1, reconciled_lines[1])])
+        self.assertEqual(index[2], [(0, reconciled_lines[0]), (2, reconciled_lines[2])])
+        self.assertFalse(index.get(3))
+
+    def test_reconciled_lines_applied_amounts(self):
+        partner_ids = [self.partner1.id, self.partner2.id]
+        report = self._get_synthetic_report_values(partner_ids)
+        currency_id = self.company.currency_id.id
+        for partner_id in partner_ids:
+            currency_data = report["data"][partner_id]["currencies"][currency_id]
+            self.assertEqual(len(currency_data["lines"]), 5)
+            for line in currency_data["lines"]:
+                self.assertEqual(line["applied_amount"], -40.0)
+                self.assertEqual(line["open_amount"], 60.0)
+            self.assertEqual(currency_data["amount_due"], 300.0)
+
+    def test_reconciled_lines_scaling(self):
+        class IdReadsDict(dict):
+            id_reads = 0
+
+            def __getitem__(self, key):
+                if key == "id":
+                    IdReadsDict.id_reads += 1
+                return super().__getitem__(key)
+
+        partners = self.env["res.partner"].create(
+            [{"name": "Statement partner %s" % i} for i in range(20)]
+        )
+        for count in (10, 20):
+            IdReadsDict.id_reads = 0
+            report = self._get_synthetic_report_values(
+                partners[:count].ids, reconciled_line_class=IdReadsDict
+            )
+            self.assertEqual(len(report["doc_ids"]), count)
+            # The reconciled lines are matched through the index, so each one
+            # is read once whatever the number of statement lines
+            self.assertEqual(IdReadsDict.id_reads, 5 * count)
+
+    def test_date_formatting_cache(self):
+        partner_ids = [self.partner1.id, self.partner2.id]
+        statement_class = type(self.statement_model)
+        format_date = statement_class._format_date_to_partner_lang
+        with patch.object(
+            statement_class,
+            "_format_date_to_partner_lang",
+            autospec=True,
+            side_effect=format_date,
+        ) as mock:
+            report = self._get_synthetic_report_values(partner_ids)
+        currency_data = report["data"][self.partner1.id]["currencies"]
+        line = currency_data[self.company.currency_id.id]["lines"][0]
+        self.assertIsInstance(line["date"], str)
+        # 5 line dates and 4 statement dates per distinct partner date format
+        date_formats = {p.lang for p in self.partner1 | self.partner2}
+        self.assertLessEqual(mock.call_count, 9 * len(date_formats))
+
+    def test_generate_attachments(self):
+        wiz_id = self.wiz.with_context(
+            active_ids=[self.partner1.id, self.partner2.id]
+        ).create(
+            {
+                "chunk_size": 1,
+                "filter_partners_non_due": False,
+                "filter_negative_balances": False,
+            }
+        )
+        job_model = self.env["partner.statement.attachment.job"]
+        action = wiz_id.button_generate_attachments()
+        self.assertEqual(action["tag"], "display_notification")
+        job = job_model.search([], order="id desc", limit=1)
+        self.assertEqual(job.state, "pending")
+        statement_class = type(self.statement_model)
+        create_tables = statement_class._create_statement_tables
+        with patch.object(
+            statement_class,
+            "_create_statement_tables",
+            autospec=True,
+            side_effect=create_tables,
+        ) as mock:
+            attachments = job._generate_attachments()
+        # one computation per chunk, reused for the rendering
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(job.state, "done")
+        self.assertEqual(
+            set(attachments.mapped("res_id")), {self.partner1.id, self.partner2.id}
+        )
+        self.assertEqual(set(attachments.mapped("res_model")), {"res.partner"})
+        # a new run does not generate the existing statements again
+        self.assertEqual(job._generate_attachments(), attachments)
+        # the statements with other options are generated again
+        wiz_id.show_aging_buckets = not wiz_id.show_aging_buckets
+        other_job = job_model.create(wiz_id._prepare_attachment_job())
+        self.assertFalse(other_job._generate_attachments() & attachments)
+
+    def test_xlsx_format_pool(self):
+        workbook = xlsxwriter.Workbook(BytesIO(), {"in_memory": True})
+        self.env["report.p_s.report_activity_statement_xlsx"]._define_formats(workbook)
+        pool = StatementFormatPool(workbook)
+        currency = self.company.currency_id
+        formats = pool.get_line_formats(currency)
+        self.assertEqual(pool.get_line_formats(currency), formats)
+        blocked_formats = pool.get_line_formats(currency, blocked=True)
+        self.assertNotEqual(blocked_formats[0], formats[0])
+        self.assertEqual(pool.get_line_formats(currency, blocked=1), blocked_formats)
+        self.assertTrue(blocked_formats[0].bg_color)
+        self.assertEqual(len(pool._formats), 8)
+        workbook.close()
+
     def test_date_formatting(self):
         date_fmt = "%d/%m/%Y"
         test_date = date(2018, 9, 30)
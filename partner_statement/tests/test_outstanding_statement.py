@@ -1,6 +1,7 @@
 # Copyright 2018 ForgeFlow, S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
+from odoo import fields
 from odoo.tests import new_test_user
 from odoo.tests.common import TransactionCase
 
@@ -93,3 +94,24 @@ class TestOutstandingStatement(TransactionCase):
         self.assertIn(
             "bucket_labels", report, "There was an error while compiling the report."
         )
+
+    def test_statement_tables(self):
+        partner_ids = [self.partner1.id, self.partner2.id]
+        date_end = fields.Date.today()
+        self.statement_model._create_statement_tables(
+            self.company.id, partner_ids, date_end, "asset_receivable"
+        )
+        lines = self.env["account.move.line"].search(
+            [
+                ("partner_id", "in", partner_ids),
+                ("company_id", "=", self.company.id),
+                ("date", "<=", date_end),
+                ("parent_state", "=", "posted"),
+                ("account_id.account_type", "=", "asset_receivable"),
+            ]
+        )
+        self.env.cr.execute("SELECT id FROM partner_statement_line")
+        self.assertEqual({r[0] for r in self.env.cr.fetchall()}, set(lines.ids))
+        partials = lines.matched_debit_ids | lines.matched_credit_ids
+        self.env.cr.execute("SELECT id FROM partner_statement_partial")
+        self.assertEqual({r[0] for r in self.env.cr.fetchall()}, set(partials.ids))
@@ -40,23 +40,22 @@ class ActivityStatementWizard(models.TransientModel):
         )
         return res
 
-    def _print_report(self, report_type):
-        self.ensure_one()
-        data = self._prepare_statement()
+    def _get_report(self, report_type):
         if report_type == "xlsx":
             report_name = "p_s.report_activity_statement_xlsx"
         else:
             report_name = "partner_statement.activity_statement"
-        partners = self.env["res.partner"].browse(data["partner_ids"])
-        return (
-            self.env["ir.actions.report"]
-            .search(
-                [("report_name", "=", report_name), ("report_type", "=", report_type)],
-                limit=1,
-            )
-            .report_action(partners, data=data)
+        return self.env["ir.actions.report"].search(
+            [("report_name", "=", report_name), ("report_type", "=", report_type)],
+            limit=1,
         )
 
+    def _print_report(self, report_type):
+        self.ensure_one()
+        data = self._prepare_statement()
+        partners = self.env["res.partner"].browse(data["partner_ids"])
+        return self._get_report(report_type).report_action(partners, data=data)
+
     def _export(self, report_type):
         """Default export is PDF."""
         return self._print_report(report_type)
@@ -1,9 +1,11 @@
 # Copyright 2018 Graeme Gellatly
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import json
+
 from dateutil.relativedelta import relativedelta
 
-from odoo import api, fields, models
+from odoo import _, api, fields, models
 
 
 class StatementCommon(models.AbstractModel):
@@ -27,6 +29,12 @@ class StatementCommon(models.AbstractModel):
         string="Don't show partners with no due entries", default=True
     )
     filter_negative_balances = fields.Boolean("Exclude Negative Balances", default=True)
+    chunk_size = fields.Integer(
+        string="Partners per Chunk",
+        default=100,
+        help="When generating the statements as attachments, number of "
+        "partners whose statements are computed and saved together.",
+    )
 
     aging_type = fields.Selection(
         [("days", "Age by Days"), ("months", "Age by Months")],
@@ -76,3 +84,47 @@ class StatementCommon(models.AbstractModel):
         self.ensure_one()
         report_type = "xlsx"
         return self._export(report_type)
+
+    def button_generate_attachments(self):
+        self.ensure_one()
+        self.env["partner.statement.attachment.job"].create(
+            self._prepare_attachment_job()
+        )
+        self.env.ref(
+            "partner_statement.ir_cron_partner_statement_attachment_job"
+        ).sudo()._trigger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "type": "info",
+                "message": _(
+                    "The statements will be saved as attachments of the "
+                    "partners in the background."
+                ),
+                "next": {"type": "ir.actions.act_window_close"},
+            },
+        }
+
+    def _get_attachment_name(self, report, data):
+        dates = [data.get("date_start"), data["date_end"]]
+        return "%s %s.pdf" % (
+            report.name,
+            " - ".join(fields.Date.to_string(d) for d in dates if d),
+        )
+
+    def _prepare_attachment_job(self):
+        """All the options of the statement but the partners are stored in
+        the job, as they identify the attachments of the statement."""
+        self.ensure_one()
+        report = self._get_report("qweb-pdf")
+        data = self._prepare_statement()
+        partner_ids = data.pop("partner_ids")
+        return {
+            "name": self._get_attachment_name(report, data),
+            "report_id": report.id,
+            "company_id": self.company_id.id,
+            "partner_ids": [fields.Command.set(partner_ids)],
+            "data": json.dumps(data, default=fields.Date.to_string, sort_keys=True),
+            "chunk_size": max(self.chunk_size, 1),
+        }